@@ -1,9 +1,125 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME, ActionForm
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.db.models import Count
+from django.template.response import TemplateResponse
 
+from .forms import LimitedImageField
 from .models import Category, Location, Post, Comment
+from .moderation import (
+    delete_authors_content,
+    reassign_category,
+    set_published
+)
+from .pagination import EstimatedCountPaginator
+from .search import get_backend
 
+User = get_user_model()
 
-class CategoryAdmin(admin.ModelAdmin):
+
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, которое берёт выбранный объект из формы, а не из БД.
+
+    Обычный AutocompleteSelect запрашивает выбранный объект для каждой
+    строки списка с list_editable.
+    """
+
+    selected_object = None
+
+    def optgroups(self, name, value, attr=None):
+        obj = self.selected_object
+        selected = {str(v) for v in value if v not in (None, '')}
+        if obj is None or selected != {str(obj.pk)}:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, obj.pk, self.choices.field.label_from_instance(obj),
+            True, len(options)
+        ))
+        return [(None, options, 0)]
+
+
+class PreloadedAutocompleteMixin:
+    """Передаёт виджетам автодополнения уже загруженные связанные объекты."""
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', PreloadedAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using')
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        names = self.get_autocomplete_fields(request)
+        base_form = super().get_changelist_form(request, **kwargs)
+
+        class ChangeListForm(base_form):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                for name in names:
+                    if name not in self.fields:
+                        continue
+                    widget = self.fields[name].widget
+                    widget = getattr(widget, 'widget', widget)
+                    # Связанные объекты загружены list_select_related.
+                    widget.selected_object = getattr(self.instance, name)
+
+        return ChangeListForm
+
+
+class BoundedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Фильтр по связанной модели, показывающий не больше limit вариантов.
+
+    Выводятся последние добавленные объекты и выбранный сейчас; по любому
+    другому можно отфильтровать ссылкой из списка связанной модели.
+    """
+
+    limit = 20
+
+    def field_choices(self, field, request, model_admin):
+        related = field.related_model._default_manager
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        queryset = related.order_by('-pk')[:self.limit]
+        pks = list(queryset.values_list('pk', flat=True))
+        selected = self.lookup_val
+        if selected and selected.isdigit() and int(selected) not in pks:
+            pks.append(int(selected))
+        return [
+            (obj.pk, str(obj))
+            for obj in related.filter(pk__in=pks).order_by(*ordering or ['-pk'])
+        ]
+
+
+class PublishActionsMixin:
+    """Массовые публикация и снятие с публикации (blog.moderation)."""
+
+    actions = ('publish', 'unpublish')
+
+    @admin.action(description='Опубликовать выбранные')
+    def publish(self, request, queryset):
+        updated = set_published(queryset, True)
+        self.message_user(request, f'Опубликовано: {updated}')
+
+    @admin.action(description='Снять с публикации выбранные')
+    def unpublish(self, request, queryset):
+        updated = set_published(queryset, False)
+        self.message_user(request, f'Снято с публикации: {updated}')
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        Category.objects.all(),
+        required=False,
+        label='Категория'
+    )
+
+
+class CategoryAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'title',
@@ -18,7 +134,7 @@ class CategoryAdmin(admin.ModelAdmin):
     empty_value_display = 'Не задано'
 
 
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = (
         'id',
         'name',
@@ -31,7 +147,11 @@ class LocationAdmin(admin.ModelAdmin):
     empty_value_display = 'Не задано'
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(
+    PublishActionsMixin,
+    PreloadedAutocompleteMixin,
+    admin.ModelAdmin
+):
     list_display = (
         'id',
         'title',
@@ -40,7 +160,8 @@ class PostAdmin(admin.ModelAdmin):
         'pub_date',
         'author',
         'location',
-        'category'
+        'category',
+        'views'
     )
     list_editable = (
         'is_published',
@@ -49,11 +170,93 @@ class PostAdmin(admin.ModelAdmin):
         'category',
         'pub_date'
     )
-    search_fields = ('title',)
-    list_filter = ('author', 'location', 'category')
+    readonly_fields = ('views',)
+    # Ограничения на загружаемые фото — как в форме на сайте.
+    formfield_overrides = {
+        models.ImageField: {'form_class': LimitedImageField},
+    }
+    # Выпадающие списки со всеми пользователями, местоположениями и
+    # категориями в каждой строке списка делали его очень медленным.
+    autocomplete_fields = ('author', 'location', 'category')
+    list_select_related = ('author', 'location', 'category')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = (
+        'publish',
+        'unpublish',
+        'move_to_category',
+        'delete_authors_content'
+    )
+    search_fields = ('title', 'text')
+    list_filter = (
+        ('author', BoundedRelatedFieldListFilter),
+        ('location', BoundedRelatedFieldListFilter),
+        'category'
+    )
     list_display_links = ('id', 'title',)
     empty_value_display = 'Не задано'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по полнотекстовому индексу вместо LIKE '%...%'.
+        if not search_term:
+            return queryset, False
+        return get_backend().filter_posts(queryset, search_term), False
+
+    @admin.action(description='Перенести выбранные в категорию')
+    def move_to_category(self, request, queryset):
+        # Поле action формы без списка действий не проходит проверку,
+        # поэтому проверяем только поле категории.
+        field = self.action_form.base_fields['category']
+        try:
+            category = field.clean(request.POST.get('category'))
+        except forms.ValidationError:
+            category = None
+        if category is None:
+            self.message_user(
+                request, 'Выберите категорию.', level=messages.ERROR
+            )
+            return
+        updated = reassign_category(queryset, category)
+        self.message_user(request, f'Перенесено в «{category}»: {updated}')
+
+    @admin.action(
+        description='Удалить все посты и комментарии авторов выбранных'
+    )
+    def delete_authors_content(self, request, queryset):
+        author_ids = (
+            queryset.order_by().values_list('author', flat=True).distinct()
+        )
+        # Как у delete_selected: сначала страница подтверждения.
+        if request.POST.get('post') != 'yes':
+            authors = (
+                User.objects.filter(pk__in=author_ids)
+                .annotate(
+                    post_count=Count('posts', distinct=True),
+                    comment_count=Count('comments', distinct=True)
+                )
+                .order_by('username')
+            )
+            request.current_app = self.admin_site.name
+            return TemplateResponse(
+                request,
+                'admin/blog/post/delete_authors_content.html',
+                {
+                    **self.admin_site.each_context(request),
+                    'title': 'Вы уверены?',
+                    'opts': self.model._meta,
+                    'queryset': queryset,
+                    'authors': authors,
+                    'action_checkbox_name': ACTION_CHECKBOX_NAME,
+                    'media': self.media,
+                }
+            )
+        posts, comments = delete_authors_content(author_ids)
+        self.message_user(
+            request,
+            f'Удалено постов: {posts}, комментариев: {comments}'
+        )
+
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = (
@@ -63,11 +266,32 @@ class CommentAdmin(admin.ModelAdmin):
         'author',
         'created_at'
     )
+    autocomplete_fields = ('post', 'author')
+    list_select_related = ('post', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = ('text',)
-    list_filter = ('post', 'author',)
+    list_filter = (
+        ('post', BoundedRelatedFieldListFilter),
+        ('author', BoundedRelatedFieldListFilter),
+    )
     list_display_links = ('id', 'text',)
     empty_value_display = 'Не задано'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return get_backend().filter_comments(queryset, search_term), False
+
+    def save_model(self, request, obj, form, change):
+        # Добавление и удаление учитывают сигналы, перенос — только здесь.
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if change and 'post' in form.changed_data:
+                Post.change_comment_count(form.initial['post'], -1)
+                Post.change_comment_count(obj.post_id, 1)
+                get_backend().index_post_comments(form.initial['post'])
+
 
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
@@ -0,0 +1,124 @@
+import hashlib
+import math
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Post
+
+# Число опубликованных постов для пагинатора главной страницы.
+PUBLISHED_POSTS_COUNT_KEY = 'blog:published_posts_count'
+# Поколение лент: меняется при любом изменении постов, комментариев,
+# категорий и местоположений и входит в ключи закэшированных страниц.
+FEED_GENERATION_KEY = 'blog:feed_generation'
+# Поколение карточек постов: меняется при изменении категорий,
+# местоположений и пользователей, данные которых выводятся в карточке.
+CARD_GENERATION_KEY = 'blog:card_generation'
+# Ближайшая отложенная публикация в текущем поколении лент.
+NEXT_PUBLICATION_KEY = 'blog:next_publication'
+
+
+def invalidate_post_counts():
+    cache.delete(PUBLISHED_POSTS_COUNT_KEY)
+
+
+def _get_generation(key):
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_feed_generation():
+    return _get_generation(FEED_GENERATION_KEY)
+
+
+def bump_feed_generation():
+    cache.set(FEED_GENERATION_KEY, time.time(), None)
+
+
+def get_card_generation():
+    return _get_generation(CARD_GENERATION_KEY)
+
+
+def bump_card_generation():
+    cache.set(CARD_GENERATION_KEY, time.time(), None)
+
+
+def get_next_publication():
+    """Время, когда станет видна ближайшая отложенная публикация."""
+    key = f'{NEXT_PUBLICATION_KEY}:{get_feed_generation()}'
+    now = timezone.now()
+    next_publication = cache.get(key)
+    if next_publication and next_publication <= now:
+        # Отложенная публикация стала видна — ленты устарели, хотя
+        # сигналов не было; начинаем новое поколение.
+        bump_feed_generation()
+        key = f'{NEXT_PUBLICATION_KEY}:{get_feed_generation()}'
+        next_publication = None
+    # Пустая строка означает «отложенных публикаций нет».
+    if next_publication is None:
+        next_publication = Post.objects.filter(
+            is_published=True,
+            pub_date__gt=now
+        ).aggregate(next=Min('pub_date'))['next'] or ''
+        cache.set(key, next_publication, settings.BLOG_FEED_CACHE_TIMEOUT)
+    return next_publication or None
+
+
+def get_feed_cache_timeout(timeout=None):
+    """Срок жизни кэша лент, истекающий к ближайшей отложенной публикации."""
+    if timeout is None:
+        timeout = settings.BLOG_FEED_CACHE_TIMEOUT
+    next_publication = get_next_publication()
+    if next_publication is not None:
+        seconds_left = (next_publication - timezone.now()).total_seconds()
+        timeout = max(1, min(timeout, math.ceil(seconds_left)))
+    return timeout
+
+
+def generation_is_shared():
+    """Хранятся ли поколения в кэше, общем для всех процессов сервера.
+
+    В памяти процесса поколение меняется только там, где произошла
+    правка, и другие процессы отвечали бы 304 на устаревшие страницы.
+    """
+    return not isinstance(
+        caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache)
+    )
+
+
+def get_feed_last_modified():
+    """Время последнего изменения данных, выводимых в лентах и на постах."""
+    # Проверка отложенных публикаций может начать новое поколение.
+    get_next_publication()
+    return datetime.fromtimestamp(get_feed_generation(), tz=dt_timezone.utc)
+
+
+def get_feed_etag(request):
+    """Тег ETag страницы по поколению лент, пользователю и адресу."""
+    get_next_publication()
+    raw = ':'.join((
+        str(get_feed_generation()),
+        str(request.user.pk),
+        request.META.get('CSRF_COOKIE', ''),
+        request.get_full_path(),
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def feed_page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:feed_page:{get_feed_generation()}:{path}'
+
+
+def cache_feed_page(key, response):
+    if response.status_code == 200:
+        cache.set(key, response.content, get_feed_cache_timeout())
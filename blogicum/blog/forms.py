@@ -1,6 +1,35 @@
 from django import forms
+from django.conf import settings
 
 from .models import User, Post, Comment
+from .uploadhandlers import too_large_file_error, too_many_pixels_error
+
+
+class LimitedImageField(forms.ImageField):
+    """Поле фото с ограничениями BLOG_UPLOAD_MAX_BYTES и _MAX_PIXELS.
+
+    Показывает причину, по которой LimitedTemporaryFileUploadHandler
+    отбросил файл, и проверяет те же ограничения у файлов, полученных
+    другими обработчиками загрузки.
+    """
+
+    def to_python(self, data):
+        upload_error = getattr(data, 'upload_error', None)
+        if upload_error:
+            raise forms.ValidationError(upload_error, code='upload_rejected')
+        file = super().to_python(data)
+        if file is None:
+            return None
+        if file.size > settings.BLOG_UPLOAD_MAX_BYTES:
+            raise forms.ValidationError(
+                too_large_file_error(), code='file_too_large'
+            )
+        width, height = file.image.size
+        if width * height > settings.BLOG_UPLOAD_MAX_PIXELS:
+            raise forms.ValidationError(
+                too_many_pixels_error(width, height), code='too_many_pixels'
+            )
+        return file
 
 
 class UserForm(forms.ModelForm):
@@ -13,6 +42,7 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ['author']
+        field_classes = {'image': LimitedImageField}
         widgets = {
             'pub_date': forms.DateInput(
                 format='%Y-%m-%d',
@@ -0,0 +1,178 @@
+"""Сведения о фото постов и уменьшенные копии в WebP для srcset.
+
+Размеры, объём и хэш фото записываются в Post.image_info при загрузке,
+чтобы шаблонам не приходилось открывать файл. Копии лежат рядом с оригиналом (post_images/photo.jpg ->
+post_images/photo.640w.webp) и генерируются после фиксации транзакции,
+в которой загружено фото. Уже существующие файлы не пересоздаются.
+
+Пул потоков работает в процессе веб-сервера: LANCZOS отпускает GIL и
+занимает ядра, которые обслуживают запросы. Поэтому пул маленький,
+очередь ограничена BLOG_IMAGE_MAX_PENDING, а фото сверх неё остаются
+без копий до запуска команды generate_image_derivatives (по cron). При
+BLOG_IMAGE_WORKERS = None веб-процессы копии не генерируют вовсе.
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core.routers import pin_to_primary
+
+from .cache import bump_feed_generation
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = None
+
+# Значения тега EXIF Orientation, при которых фото повёрнуто на 90°.
+EXIF_ORIENTATION = 0x0112
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def derivative_name(name, width):
+    # Копии пишутся обычным хранилищем: имя выводится из имени оригинала,
+    # а не из содержимого копии (см. blog.storage).
+    root, _ = os.path.splitext(name)
+    return f'{root}.{width}w.webp'
+
+
+def read_image_info(file):
+    """Размеры (с учётом поворота из EXIF), объём и SHA-256 файла фото."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in file.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    with Image.open(file) as image:
+        width, height = image.size
+        if image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+    file.seek(0)
+    return {
+        'width': width,
+        'height': height,
+        'size': size,
+        'sha256': digest.hexdigest(),
+    }
+
+
+def generate_derivatives(name, storage=default_storage):
+    """Создать недостающие копии фото; вернуть список их ширин."""
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = (
+            'A' in image.getbands() or 'transparency' in image.info
+        )
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    widths = []
+    # Копии шире оригинала не нужны: в srcset попадёт сам оригинал.
+    for width in sorted(settings.BLOG_IMAGE_WIDTHS):
+        if width >= image.width:
+            break
+        widths.append(width)
+        target = derivative_name(name, width)
+        if storage.exists(target):
+            continue
+        height = max(1, round(image.height * width / image.width))
+        buffer = BytesIO()
+        image.resize((width, height), Image.Resampling.LANCZOS).save(
+            buffer, 'WEBP', quality=settings.BLOG_IMAGE_QUALITY
+        )
+        saved = storage.save(target, ContentFile(buffer.getvalue()))
+        if saved != target:
+            # Копию успел записать другой поток или процесс — остаётся
+            # его файл, а не дубликат с суффиксом.
+            storage.delete(saved)
+    return widths
+
+
+def process_post_image(post_id, name):
+    # Фото могли заменить, пока шла генерация.
+    posts = Post.objects.filter(pk=post_id, image=name)
+    try:
+        widths = generate_derivatives(name)
+        image_info = posts.values_list('image_info', flat=True).first()
+        if image_info is None:
+            return
+        if 'sha256' not in image_info:
+            # Фото загружено до того, как сведения стали сохраняться.
+            with default_storage.open(name, 'rb') as source:
+                image_info = read_image_info(source)
+    except (OSError, ValueError):
+        logger.exception('Не удалось обработать фото %s', name)
+        return
+    updated = posts.update(
+        image_info={**image_info, 'widths': widths},
+        updated_at=timezone.now()
+    )
+    if updated:
+        bump_feed_generation()
+
+
+def _run_in_worker(post_id, name):
+    try:
+        # Пост только что записан — реплики могли его ещё не получить.
+        with pin_to_primary():
+            process_post_image(post_id, name)
+    finally:
+        connections.close_all()
+        _pending.release()
+
+
+def get_executor():
+    global _executor, _pending
+    with _executor_lock:
+        if _executor is None:
+            _pending = threading.BoundedSemaphore(
+                settings.BLOG_IMAGE_MAX_PENDING
+            )
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BLOG_IMAGE_WORKERS,
+                thread_name_prefix='blog-images'
+            )
+    return _executor
+
+
+def submit_derivatives(post_id, name):
+    """Отдать фото пулу; при переполненной очереди вернуть False."""
+    executor = get_executor()
+    if not _pending.acquire(blocking=False):
+        logger.warning(
+            'Очередь фото переполнена, копии %s создаст'
+            ' generate_image_derivatives', name
+        )
+        return False
+    executor.submit(_run_in_worker, post_id, name)
+    return True
+
+
+def schedule_derivatives(post):
+    """Запланировать генерацию копий после фиксации транзакции."""
+    post_id, name = post.pk, post.image.name
+    workers = settings.BLOG_IMAGE_WORKERS
+    if workers is None:
+        return
+
+    def submit():
+        if workers:
+            submit_derivatives(post_id, name)
+        else:
+            process_post_image(post_id, name)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,56 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from blog.cache import bump_card_generation, bump_feed_generation
+from blog.images import read_image_info
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Записывает в Post.image_info размеры, объём и SHA-256 фото, '
+        'загруженных до того, как эти сведения стали сохраняться.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Сколько постов обрабатывать за один проход.'
+        )
+
+    def handle(self, *args, **options):
+        posts = (
+            Post.objects
+            .exclude(image='').exclude(image__isnull=True)
+            .exclude(image_info__has_key='sha256')
+            .only('image', 'image_info')
+            .order_by('pk')
+        )
+        filled = missing = 0
+        last_pk = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for post in batch:
+                try:
+                    with default_storage.open(post.image.name, 'rb') as file:
+                        info = read_image_info(file)
+                except OSError:
+                    self.stderr.write(f'Пост {post.pk}: нет файла {post.image}')
+                    missing += 1
+                    continue
+                Post.objects.filter(pk=post.pk).update(
+                    image_info={**post.image_info, **info}
+                )
+                filled += 1
+        if filled:
+            # updated_at не менялся, поэтому сбрасываем все карточки.
+            bump_card_generation()
+            bump_feed_generation()
+        self.stdout.write(self.style.SUCCESS(
+            f'Заполнено: {filled}, без файла: {missing}'
+        ))
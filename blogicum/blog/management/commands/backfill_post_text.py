@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, make_excerpt, render_text_html
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.excerpt и Post.text_html по тексту постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько постов обрабатывать за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .only('text', 'excerpt', 'text_html')
+                .order_by('pk')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            changed = []
+            for post in batch:
+                excerpt = make_excerpt(post.text)
+                text_html = render_text_html(post.text)
+                if (post.excerpt, post.text_html) != (excerpt, text_html):
+                    post.excerpt = excerpt
+                    post.text_html = text_html
+                    changed.append(post)
+            Post.objects.bulk_update(changed, ['excerpt', 'text_html'])
+            updated += len(changed)
+        self.stdout.write(self.style.SUCCESS(f'Обновлено постов: {updated}'))
@@ -0,0 +1,126 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.models import Category, Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы и время запросов лент с индексами Post и без них. '
+        'Все изменения (посев данных, удаление индексов) откатываются, '
+        'поэтому нужна СУБД с транзакционным DDL (SQLite, PostgreSQL).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Сколько постов добавить перед замером.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Сколько раз выполнить каждый запрос при замере времени.'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self.seed(options['seed'])
+            self.report('С индексами', options['repeat'])
+            self.drop_indexes()
+            self.report('Без индексов', options['repeat'])
+            transaction.set_rollback(True)
+
+    def seed(self, n_posts):
+        authors = [
+            User.objects.create(username=f'benchmark_{i}') for i in range(20)
+        ]
+        categories = [
+            Category.objects.create(
+                title=f'Benchmark {i}',
+                description='',
+                slug=f'benchmark-{i}',
+                is_published=i % 5 != 0
+            )
+            for i in range(10)
+        ]
+        now = timezone.now()
+        Post.objects.bulk_create(
+            (
+                Post(
+                    title=f'Пост {i}',
+                    text='Текст',
+                    pub_date=now - timedelta(minutes=random.randint(
+                        -60 * 24 * 7, 60 * 24 * 365 * 3
+                    )),
+                    author=random.choice(authors),
+                    category=random.choice(categories),
+                    is_published=random.random() > 0.05
+                )
+                for i in range(n_posts)
+            ),
+            batch_size=1000
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(f'Добавлено постов: {n_posts}')
+
+    def drop_indexes(self):
+        schema_editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in Post._meta.indexes:
+                cursor.execute(str(index.remove_sql(Post, schema_editor)))
+
+    def get_querysets(self):
+        now = timezone.now()
+        post = Post.objects.order_by('?').first()
+        author_id = post.author_id if post else 0
+        category_id = post.category_id if post else 0
+        return {
+            'Главная': Post.published_posts.all()[:10],
+            'Профиль (чужой)': (
+                Post.published_posts.filter(author_id=author_id)[:10]
+            ),
+            'Профиль (свой)': (
+                Post.objects.filter(author_id=author_id)
+                .order_by('-pub_date', '-id')[:10]
+            ),
+            'Категория': (
+                Post.objects.filter(
+                    category_id=category_id,
+                    is_published=True,
+                    pub_date__lte=now
+                ).order_by('-pub_date', '-id')[:10]
+            ),
+        }
+
+    def report(self, title, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, queryset in self.get_querysets().items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(queryset.all())
+            elapsed = (time.perf_counter() - started) / repeat * 1000
+            self.stdout.write(f'{name}: {elapsed:.2f} мс')
+            self.explain(queryset, title)
+
+    def explain(self, queryset, title):
+        # QuerySet.explain() на SQLite отдаёт закэшированный план
+        # после DROP INDEX, поэтому текст запроса делаем уникальным.
+        sql, params = queryset.query.sql_with_params()
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql} /* {title} */', params)
+            for row in cursor.fetchall():
+                self.stdout.write(f'    {row[-1]}')
@@ -0,0 +1,76 @@
+import os
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+# post_images/ab/abcd….640w.webp -> post_images/ab/abcd…
+DERIVATIVE_SUFFIX_RE = re.compile(r'\.\d+w\.webp$')
+
+
+def image_root(name):
+    return os.path.splitext(DERIVATIVE_SUFFIX_RE.sub('', name))[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из каталога фото постов файлы, на которые не ссылается ни '
+        'один пост, вместе с их уменьшенными копиями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=24 * 60 * 60,
+            help=(
+                'Не трогать файлы моложе стольких секунд: их может '
+                'сохранять ещё не завершённый запрос.'
+            )
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать файлы, которые будут удалены.'
+        )
+
+    def walk(self, storage, directory):
+        directories, files = storage.listdir(directory)
+        for name in files:
+            yield os.path.join(directory, name)
+        for subdirectory in directories:
+            yield from self.walk(storage, os.path.join(directory, subdirectory))
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        directory = field.upload_to.rstrip('/')
+        if not storage.exists(directory):
+            return
+        # Ссылки на файл считаются по базе: один файл может быть у
+        # нескольких постов, удаляем его, только когда их не осталось.
+        referenced = {
+            image_root(name)
+            for name in Post.objects.exclude(image='')
+            .exclude(image__isnull=True)
+            .values_list('image', flat=True)
+            .iterator()
+        }
+        deadline = time.time() - options['grace']
+        removed = freed = 0
+        for name in self.walk(storage, directory):
+            if image_root(name) in referenced:
+                continue
+            if storage.get_modified_time(name).timestamp() > deadline:
+                continue
+            size = storage.size(name)
+            self.stdout.write(f'{name} ({size} байт)')
+            if not options['dry_run']:
+                storage.delete(name)
+            removed += 1
+            freed += size
+        self.stdout.write(self.style.SUCCESS(
+            f'Неиспользуемых файлов: {removed}, {freed} байт'
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import process_post_image
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии фото постов, для которых их ещё нет '
+        '(например, загруженных до появления генерации копий).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Обработать все фото, а не только без копий.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            posts = posts.exclude(image_info__has_key='widths')
+        processed = 0
+        for pk, name in posts.values_list('pk', 'image').iterator():
+            process_post_image(pk, name)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано фото: {processed}'))
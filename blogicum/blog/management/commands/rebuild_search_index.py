@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import get_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает поисковый индекс постов и комментариев, например '
+        'после массовых изменений через QuerySet.update() в обход сигналов.'
+    )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(
+            f'Поисковый индекс перестроен ({type(backend).__name__}).'
+        )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Сверяет Post.comment_count с таблицей комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, ничего не меняя.'
+        )
+
+    def handle(self, *args, **options):
+        # Тот же подзапрос, что и в миграции 0008: исправление — один UPDATE.
+        counts = (
+            Comment.objects
+            .filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(n=Count('pk'))
+            .values('n')
+        )
+        actual = Coalesce(Subquery(counts), 0)
+        drifted = Post.objects.exclude(comment_count=actual)
+        if options['dry_run']:
+            rows = drifted.annotate(actual=actual).values_list(
+                'pk', 'comment_count', 'actual'
+            )
+            for pk, stored, count in rows:
+                self.stdout.write(f'Пост {pk}: {stored} -> {count}')
+            fixed = len(rows)
+        else:
+            fixed = drifted.update(comment_count=actual)
+        self.stdout.write(self.style.SUCCESS(f'Расхождений: {fixed}'))
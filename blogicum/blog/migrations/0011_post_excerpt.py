@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:11
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_pk).only('text').order_by('pk')[:500]
+        )
+        if not posts:
+            break
+        last_pk = posts[-1].pk
+        for post in posts:
+            post.excerpt = Truncator(post.text).words(10, truncate=' …')[:512]
+        Post.objects.bulk_update(posts, ['excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Начало текста для карточки поста, заполняется автоматически', max_length=512, verbose_name='Отрывок'),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
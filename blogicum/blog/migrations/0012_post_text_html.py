@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:12
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+
+
+def fill_text_html(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_pk).only('text').order_by('pk')[:500]
+        )
+        if not posts:
+            break
+        last_pk = posts[-1].pk
+        for post in posts:
+            post.text_html = linebreaksbr(post.text, autoescape=True)
+        Post.objects.bulk_update(posts, ['text_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, help_text='Текст, подготовленный для страницы поста, заполняется автоматически', verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_text_html, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+POST_INDEX_TABLE = 'blog_post_fts'
+COMMENT_INDEX_TABLE = 'blog_comment_fts'
+
+
+def create_search_index(apps, schema_editor):
+    # Индекс FTS5 нужен только на SQLite, на PostgreSQL поиск идёт по tsvector.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {POST_INDEX_TABLE} USING fts5('
+        "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {COMMENT_INDEX_TABLE} USING fts5('
+        "text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'INSERT INTO {POST_INDEX_TABLE} (rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+    schema_editor.execute(
+        f'INSERT INTO {COMMENT_INDEX_TABLE} (rowid, text) '
+        'SELECT id, text FROM blog_comment'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {POST_INDEX_TABLE}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {COMMENT_INDEX_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_comment_post_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
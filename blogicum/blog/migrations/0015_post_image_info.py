@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_info',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Сведения о фото'),
+        ),
+    ]
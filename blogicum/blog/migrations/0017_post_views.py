@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='views',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Просмотры'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+CONFIG = 'russian'
+
+
+def add_search_vectors(apps, schema_editor):
+    # На SQLite поиск идёт по таблицам FTS5 (миграция 0014).
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE blog_post ADD COLUMN search_vector tsvector '
+        'GENERATED ALWAYS AS ('
+        f"setweight(to_tsvector('{CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{CONFIG}', coalesce(text, '')), 'B')"
+        ') STORED'
+    )
+    schema_editor.execute(
+        'CREATE INDEX blog_post_search_vector_idx '
+        'ON blog_post USING gin (search_vector)'
+    )
+    schema_editor.execute(
+        'ALTER TABLE blog_comment ADD COLUMN search_vector tsvector '
+        f"GENERATED ALWAYS AS (to_tsvector('{CONFIG}', coalesce(text, ''))) "
+        'STORED'
+    )
+    schema_editor.execute(
+        'CREATE INDEX blog_comment_search_vector_idx '
+        'ON blog_comment USING gin (search_vector)'
+    )
+
+
+def remove_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE blog_post DROP COLUMN search_vector')
+    schema_editor.execute(
+        'ALTER TABLE blog_comment DROP COLUMN search_vector'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_views'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vectors, remove_search_vectors),
+    ]
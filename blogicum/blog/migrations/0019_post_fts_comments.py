@@ -0,0 +1,48 @@
+from django.db import migrations
+
+POST_INDEX_TABLE = 'blog_post_fts'
+TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2'"
+COMMENTS_TEXT_SQL = (
+    "SELECT group_concat(text, ' ') FROM blog_comment "
+    'WHERE blog_comment.post_id = blog_post.id'
+)
+
+
+def add_comments_column(apps, schema_editor):
+    # Таблицу FTS5 нельзя изменить через ALTER — создаём её заново.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE {POST_INDEX_TABLE}')
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {POST_INDEX_TABLE} USING fts5('
+        f'title, text, comments, {TOKENIZE})'
+    )
+    schema_editor.execute(
+        f'INSERT INTO {POST_INDEX_TABLE} (rowid, title, text, comments) '
+        f'SELECT id, title, text, ({COMMENTS_TEXT_SQL}) FROM blog_post'
+    )
+
+
+def remove_comments_column(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE {POST_INDEX_TABLE}')
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {POST_INDEX_TABLE} USING fts5('
+        f'title, text, {TOKENIZE})'
+    )
+    schema_editor.execute(
+        f'INSERT INTO {POST_INDEX_TABLE} (rowid, title, text) '
+        'SELECT id, title, text FROM blog_post'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_comments_column, remove_comments_column),
+    ]
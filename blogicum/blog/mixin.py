@@ -1,9 +1,30 @@
+import time
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import HttpResponseRedirect
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from core.middleware import is_pinned_to_primary
+from core.routers import read_from_replicas
 
+from .cache import (
+    cache_feed_page,
+    feed_page_key,
+    generation_is_shared,
+    get_card_generation,
+    get_feed_cache_timeout,
+    get_feed_etag,
+    get_feed_generation,
+    get_feed_last_modified
+)
 from .models import Post
 from .forms import PostForm
+from .pagination import CachedCountPaginator, CursorPaginator
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
@@ -37,3 +58,159 @@ class CommentSuccessUrlMixin(LoginRequiredMixin):
             'blog:post_detail',
             kwargs={'post_id': self.kwargs['post_id']}
         )
+
+
+class CachedCountMixin:
+    paginator_class = CachedCountPaginator
+    count_cache_key = None
+
+    def get_count_timeout(self):
+        # Число опубликованных постов меняется и без сигналов — когда
+        # наступает время отложенной публикации.
+        return get_feed_cache_timeout(settings.BLOG_COUNT_CACHE_TIMEOUT)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            count_cache_key=self.count_cache_key,
+            count_timeout=self.get_count_timeout,
+            # Число с отстающей реплики осталось бы в кэше до следующего
+            # изменения постов.
+            store_count=not getattr(self.request, 'replica_may_lag', False),
+            **kwargs
+        )
+
+
+class CursorPaginationMixin:
+    """Курсорная пагинация ленты через ?after=/?before=.
+
+    Включается настройкой BLOG_CURSOR_PAGINATION или наличием курсора
+    в запросе; иначе работает обычная пагинация ListView по ?page=N.
+    """
+
+    def use_cursor_pagination(self):
+        return (
+            settings.BLOG_CURSOR_PAGINATION
+            or 'after' in self.request.GET
+            or 'before' in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        page = paginator.get_page(
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class ReplicaReadMixin:
+    """Читает данные страницы с реплик базы (core.routers), если можно.
+
+    С основной базы читают изменяющие запросы и пользователи, которые
+    недавно что-то изменили (cookie из core.middleware). В первые
+    REPLICA_PIN_SECONDS секунд после изменения лент реплика может ещё
+    отставать: такие страницы читаются с неё, но request.replica_may_lag
+    не даёт положить их в кэш и выдать им ETag нового поколения.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        from_replica = self.can_read_from_replica(request)
+        request.replica_may_lag = from_replica and (
+            time.time() - get_feed_generation()
+            < settings.REPLICA_PIN_SECONDS
+        )
+        with read_from_replicas(from_replica):
+            return super().dispatch(request, *args, **kwargs)
+
+    def can_read_from_replica(self, request):
+        return bool(settings.DATABASE_REPLICAS) and not is_pinned_to_primary(
+            request
+        )
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, не выполняя запросов к данным страницы.
+
+    ETag и Last-Modified строятся по поколению лент, которое меняется при
+    любом изменении выводимых данных и при наступлении отложенной
+    публикации. Если кэш не общий для процессов сервера, валидаторы не
+    выдаются: поколение в другом процессе могло устареть. Не выдаются
+    они и странице, прочитанной с возможно отстающей реплики.
+    """
+
+    def get(self, request, *args, **kwargs):
+        view = super().get
+        may_lag = getattr(request, 'replica_may_lag', False)
+        if generation_is_shared() and not may_lag:
+            view = condition(
+                etag_func=(
+                    lambda request, *args, **kwargs: get_feed_etag(request)
+                ),
+                last_modified_func=(
+                    lambda request, *args, **kwargs: get_feed_last_modified()
+                )
+            )(view)
+        response = view(request, *args, **kwargs)
+        # Браузер должен проверять актуальность страницы при каждом заходе.
+        patch_cache_control(
+            response, no_cache=True, private=request.user.is_authenticated
+        )
+        return response
+
+
+class PostCardCacheMixin:
+    """Контекст для кэша фрагментов в includes/post_card.html."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['card_generation'] = get_card_generation()
+        context['card_cache_timeout'] = settings.BLOG_POST_CARD_CACHE_TIMEOUT
+        return context
+
+
+class FeedCacheMixin(PostCardCacheMixin):
+    """Отдаёт анонимным пользователям страницы ленты из кэша.
+
+    Ключ включает поколение лент, поэтому правки постов, комментариев,
+    категорий и местоположений видны сразу.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        key = feed_page_key(request)
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().get(request, *args, **kwargs)
+        if not getattr(request, 'replica_may_lag', False):
+            response.add_post_render_callback(
+                lambda rendered: cache_feed_page(key, rendered)
+            )
+        return response
+
+
+class PostCommentsMixin:
+    """Пост с проверкой видимости и страница его комментариев."""
+
+    def get_visible_post(self):
+        post = get_object_or_404(
+            Post.objects.with_related(),
+            pk=self.kwargs['post_id']
+        )
+        if post.author_id != self.request.user.id and not post.is_public:
+            raise Http404
+        return post
+
+    def get_comments_page(self, post):
+        paginator = CursorPaginator(
+            post.comments.select_related('author'),
+            settings.BLOG_COMMENTS_PER_PAGE,
+            key_field='created_at',
+            descending=False
+        )
+        return paginator.get_page(after=self.request.GET.get('after'))
@@ -1,12 +1,31 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.template.defaultfilters import linebreaksbr
 from django.utils import timezone
+from django.utils.text import Truncator
 
 from core.models import PublishedModel
 
+from .storage import ContentAddressedStorage
+
 
 User = get_user_model()
 
+# Сколько слов текста показывать в карточке поста.
+EXCERPT_WORDS = 10
+EXCERPT_MAX_LENGTH = 512
+
+
+def make_excerpt(text):
+    # То же, что фильтр truncatewords в шаблоне.
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    return excerpt[:EXCERPT_MAX_LENGTH]
+
+
+def render_text_html(text):
+    # То же, что {{ post.text|linebreaksbr }} в шаблоне.
+    return linebreaksbr(text, autoescape=True)
+
 
 class Category(PublishedModel):
     title = models.CharField(
@@ -51,15 +70,42 @@ class Location(PublishedModel):
         return self.name
 
 
-class PublishedPostManager(models.Manager):
+class PostQuerySet(models.QuerySet):
+    # Поля, которые выводит includes/post_card.html.
+    FEED_FIELDS = (
+        'title',
+        'excerpt',
+        'pub_date',
+        'image',
+        'image_info',
+        'is_published',
+        'comment_count',
+        'updated_at',
+        'author__username',
+        'category__title',
+        'category__slug',
+        'category__is_published',
+        'location__name',
+        'location__is_published',
+    )
+
+    def with_related(self):
+        return self.select_related('author', 'category', 'location')
+
+    def for_feed(self):
+        return self.with_related().only(*self.FEED_FIELDS)
+
+
+PostManager = models.Manager.from_queryset(PostQuerySet)
+
+
+class PublishedPostManager(PostManager):
     def get_queryset(self):
         return super().get_queryset().filter(
             is_published=True,
             category__is_published=True,
             pub_date__lte=timezone.now()
-        ).annotate(
-            comment_count=models.Count('comments')
-        ).order_by('-pub_date')
+        ).with_related().order_by('-pub_date', '-id')
 
 
 class Post(PublishedModel):
@@ -73,6 +119,21 @@ class Post(PublishedModel):
         'Текст',
         help_text='Текст публикации, обязательное поле'
     )
+    text_html = models.TextField(
+        'Текст в HTML',
+        blank=True,
+        editable=False,
+        help_text='Текст, подготовленный для страницы поста, заполняется '
+                  'автоматически'
+    )
+    excerpt = models.CharField(
+        'Отрывок',
+        max_length=EXCERPT_MAX_LENGTH,
+        blank=True,
+        editable=False,
+        help_text='Начало текста для карточки поста, заполняется '
+                  'автоматически'
+    )
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text='Если установить дату и время в будущем — можно '
@@ -103,21 +164,108 @@ class Post(PublishedModel):
     image = models.ImageField(
         'Фото',
         upload_to='post_images/',
+        storage=ContentAddressedStorage(),
         null=True, blank=True
     )
+    # Сведения о фото (blog.images): width, height, size и sha256
+    # оригинала записываются при загрузке, widths — ширины уменьшенных
+    # копий — после их фоновой генерации.
+    image_info = models.JSONField(
+        'Сведения о фото',
+        default=dict,
+        blank=True,
+        editable=False
+    )
+    # Счётчик поддерживается представлениями и админкой комментариев,
+    # расхождения исправляет команда recount_comments.
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    # Просмотры копятся в памяти процесса и записываются пачками
+    # (blog.views_counter), поэтому отстают на несколько секунд.
+    views = models.BigIntegerField(
+        'Просмотры',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено',
+        auto_now=True
+    )
+
+    # Поля, которые не записываются при полном сохранении поста.
+    COUNTER_FIELDS = ('comment_count', 'views')
 
     # Все посты.
-    objects = models.Manager()
+    objects = PostManager()
     # Опубликованные посты.
     published_posts = PublishedPostManager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        # Индексы под ленты: главная, страница автора и страница категории.
+        # Порядок (pub_date, id) совпадает с сортировкой и курсором лент.
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_category_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def is_public(self):
+        """Пост виден всем — те же условия, что у published_posts."""
+        return (
+            self.is_published
+            and self.category is not None
+            and self.category.is_published
+            and self.pub_date <= timezone.now()
+        )
+
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        # Счётчики меняются только через F() (change_comment_count,
+        # blog.views_counter) — полное сохранение загруженного раньше
+        # объекта не должно перезаписывать их устаревшими значениями.
+        # С update_fields Django не вставляет строку заново: сохранение
+        # поста, удалённого параллельно, падает с DatabaseError.
+        if (
+            update_fields is None
+            and not force_insert
+            and not self._state.adding
+            and self.pk is not None
+        ):
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(force_insert, force_update, using, update_fields)
+
+    @classmethod
+    def change_comment_count(cls, post_id, delta):
+        cls.objects.filter(pk=post_id).update(
+            comment_count=models.F('comment_count') + delta
+        )
+
 
 class Comment(models.Model):
     text = models.TextField(
@@ -146,6 +294,13 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['created_at']
+        # Под курсорную пагинацию комментариев поста по (created_at, id).
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                name='comment_post_created_at_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text
@@ -0,0 +1,141 @@
+"""Массовые действия модерации одним UPDATE/DELETE на пачку строк.
+
+Сигналы моделей при этом не срабатывают, поэтому счётчики, кэши и
+поисковый индекс обновляются здесь же — один раз на всё действие.
+"""
+from django.db import connections, router, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .cache import (
+    bump_card_generation,
+    bump_feed_generation,
+    invalidate_post_counts
+)
+from .models import Category, Comment, Location, Post
+from .search import get_backend
+
+# SQLite до 3.32 принимает не больше 999 параметров в одном запросе.
+BATCH_SIZE = 900
+
+
+def iter_pk_batches(queryset, batch_size=BATCH_SIZE):
+    """Первичные ключи queryset пачками, по возрастанию."""
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        batch_qs = pks if last_pk is None else pks.filter(pk__gt=last_pk)
+        batch = list(batch_qs[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1]
+        yield batch
+
+
+def invalidate_after_moderation(model):
+    if model in (Post, Category):
+        invalidate_post_counts()
+    if model in (Category, Location):
+        bump_card_generation()
+    bump_feed_generation()
+
+
+def set_published(queryset, is_published):
+    """Опубликовать или снять с публикации объекты; вернуть их число."""
+    model = queryset.model
+    values = {'is_published': is_published}
+    if model is Post:
+        # updated_at входит в ключ кэша карточки поста.
+        values['updated_at'] = timezone.now()
+    updated = 0
+    for batch in iter_pk_batches(queryset.exclude(is_published=is_published)):
+        updated += model.objects.filter(pk__in=batch).update(**values)
+    if updated:
+        invalidate_after_moderation(model)
+    return updated
+
+
+def reassign_category(queryset, category):
+    """Перенести посты в другую категорию; вернуть их число."""
+    updated = 0
+    posts = queryset.exclude(category=category)
+    for batch in iter_pk_batches(posts):
+        updated += Post.objects.filter(pk__in=batch).update(
+            category=category, updated_at=timezone.now()
+        )
+    if updated:
+        invalidate_after_moderation(Post)
+    return updated
+
+
+def delete_rows(model, values, field='pk'):
+    """Удалить строки, у которых field входит в values; вернуть их число.
+
+    В отличие от QuerySet.delete() объекты не загружаются, сигналы не
+    отправляются и зависимые строки не удаляются — это делает вызывающий
+    код. Обычный DELETE вместо закрытого QuerySet._raw_delete().
+    """
+    if not values:
+        return 0
+    opts = model._meta
+    column = opts.pk.column if field == 'pk' else opts.get_field(field).column
+    connection = connections[router.db_for_write(model)]
+    quote_name = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote_name(opts.db_table)} '
+            f'WHERE {quote_name(column)} IN ({placeholders})',
+            list(values)
+        )
+        return cursor.rowcount
+
+
+def delete_authors_content(author_ids):
+    """Удалить все посты и комментарии авторов.
+
+    Вернуть число удалённых постов и комментариев.
+    """
+    author_ids = list(author_ids)
+    backend = get_backend()
+    deleted_comments = deleted_posts = 0
+    # Комментарии авторов под чужими постами: эти посты остаются,
+    # уменьшаем их счётчики.
+    comments = Comment.objects.filter(author__in=author_ids).exclude(
+        post__author__in=author_ids
+    )
+    for batch in iter_pk_batches(comments):
+        with transaction.atomic():
+            counts = list(
+                Comment.objects.filter(pk__in=batch)
+                .order_by().values('post').annotate(n=Count('pk'))
+            )
+            deleted_comments += delete_rows(Comment, batch)
+            backend.delete_comments(batch)
+            for row in counts:
+                Post.change_comment_count(row['post'], -row['n'])
+                backend.index_post_comments(row['post'])
+    # Посты удаляются в одной транзакции с комментариями под ними.
+    # Блокировка постов не даёт добавить к ним комментарий между двумя
+    # DELETE. На SQLite select_for_update() ничего не делает: там любая
+    # запись и так блокирует всю базу до конца транзакции.
+    for batch in iter_pk_batches(Post.objects.filter(author__in=author_ids)):
+        with transaction.atomic():
+            batch = list(
+                Post.objects.select_for_update()
+                .filter(pk__in=batch).values_list('pk', flat=True)
+            )
+            comment_ids = list(
+                Comment.objects.filter(post__in=batch)
+                .values_list('pk', flat=True)
+            )
+            deleted_comments += delete_rows(Comment, batch, field='post')
+            deleted_posts += delete_rows(Post, batch)
+            backend.delete_posts(batch)
+            for start in range(0, len(comment_ids), BATCH_SIZE):
+                backend.delete_comments(
+                    comment_ids[start:start + BATCH_SIZE]
+                )
+    if deleted_posts or deleted_comments:
+        invalidate_after_moderation(Post)
+    return deleted_posts, deleted_comments
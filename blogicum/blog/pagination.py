@@ -0,0 +1,218 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+# Наибольшее значение первичного ключа (BigAutoField, INTEGER в SQLite).
+MAX_PK = 2 ** 63 - 1
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, pk):
+    raw = f'{value.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.rsplit('|', 1)
+        value, pk = datetime.fromisoformat(value), int(pk)
+    except (binascii.Error, UnicodeError, ValueError) as error:
+        raise InvalidCursor(token) from error
+    # Курсоры создаёт только encode_cursor: время всегда с часовым поясом,
+    # а ключ в пределах столбца — иначе СУБД ответит ошибкой.
+    if value.utcoffset() is None or not 1 <= pk <= MAX_PK:
+        raise InvalidCursor(token)
+    return value, pk
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, берущий приблизительное число объектов из кэша.
+
+    COUNT(*) выполняется не чаще раза в count_timeout секунд (по умолчанию
+    BLOG_COUNT_CACHE_TIMEOUT; можно передать функцию, вычисляющую срок);
+    без count_cache_key ведёт себя как обычный Paginator. С store_count=False
+    число берётся из кэша, но посчитанное заново туда не записывается.
+    """
+
+    def __init__(self, *args, count_cache_key=None, count_timeout=None,
+                 store_count=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.count_timeout = count_timeout
+        self.store_count = store_count
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return super().count
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = super().count
+            if not self.store_count:
+                return count
+            timeout = self.count_timeout
+            if callable(timeout):
+                timeout = timeout()
+            if timeout is None:
+                timeout = settings.BLOG_COUNT_CACHE_TIMEOUT
+            cache.set(self.count_cache_key, count, timeout)
+        return count
+
+
+def estimate_table_rows(model, using='default'):
+    """Число строк таблицы по статистике СУБД или None, если её нет."""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    elif connection.vendor == 'sqlite':
+        # Первое число в sqlite_stat1.stat — строки таблицы (после ANALYZE).
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator для больших таблиц в админке.
+
+    Без фильтров число объектов берётся из статистики СУБД, с фильтрами
+    считается не дальше count_limit строк, поэтому страницы за этой
+    границей недоступны — сузьте поиск.
+    """
+
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.count_limit:
+                return estimate
+        return queryset.order_by()[:self.count_limit].count()
+
+
+class CursorPage:
+    # Признак для includes/paginator.html.
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу (key_field, id) без COUNT(*) и OFFSET.
+
+    Каждая страница — один запрос с условием по позиции последней
+    показанной записи, поэтому глубина страницы не влияет на его стоимость.
+    """
+
+    def __init__(self, queryset, per_page, key_field='pub_date',
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.key_field = key_field
+        self.descending = descending
+
+    def get_page(self, after=None, before=None):
+        """Вернуть страницу; битый курсор ведёт на первую страницу."""
+        try:
+            if before:
+                return self._page_before(decode_cursor(before))
+            if after:
+                return self._page_after(decode_cursor(after))
+        except InvalidCursor:
+            pass
+        return self._page_after(None)
+
+    def cursor_for(self, obj):
+        return encode_cursor(getattr(obj, self.key_field), obj.pk)
+
+    def _ordering(self, forward):
+        prefix = '-' if self.descending == forward else ''
+        return f'{prefix}{self.key_field}', f'{prefix}pk'
+
+    def _seek(self, position, forward):
+        queryset = self.queryset.order_by(*self._ordering(forward))
+        if position is None:
+            return queryset
+        value, pk = position
+        lookup = 'lt' if self.descending == forward else 'gt'
+        return queryset.filter(
+            Q(**{f'{self.key_field}__{lookup}': value})
+            | Q(**{self.key_field: value, f'pk__{lookup}': pk})
+        )
+
+    def _page_after(self, position):
+        items = list(self._seek(position, forward=True)[:self.per_page + 1])
+        has_next = len(items) > self.per_page
+        items = items[:self.per_page]
+        return CursorPage(
+            items,
+            self,
+            next_cursor=self.cursor_for(items[-1]) if has_next else None,
+            previous_cursor=(
+                self.cursor_for(items[0])
+                if position is not None and items else None
+            ),
+        )
+
+    def _page_before(self, position):
+        items = list(self._seek(position, forward=False)[:self.per_page + 1])
+        has_previous = len(items) > self.per_page
+        items = items[:self.per_page][::-1]
+        return CursorPage(
+            items,
+            self,
+            next_cursor=self.cursor_for(items[-1]) if items else None,
+            previous_cursor=(
+                self.cursor_for(items[0]) if has_previous else None
+            ),
+        )
@@ -0,0 +1,309 @@
+"""Полнотекстовый поиск по постам и комментариям.
+
+Бэкенд выбирается по СУБД (или настройкой BLOG_SEARCH_BACKEND):
+на SQLite — таблицы FTS5, которые обновляются сигналами из signals.py,
+на PostgreSQL — столбцы tsvector с индексами GIN, которые СУБД
+пересчитывает сама (миграция 0018).
+
+Поиск на сайте находит пост и по тексту комментариев к нему;
+поиск в админке — только по собственным полям объекта.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+POST_INDEX_TABLE = 'blog_post_fts'
+COMMENT_INDEX_TABLE = 'blog_comment_fts'
+
+# Тексты комментариев поста для столбца comments индекса постов.
+POST_COMMENTS_SQL = (
+    "SELECT group_concat(text, ' ') FROM blog_comment WHERE post_id = %s"
+)
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+class BaseSearchBackend:
+    """Бэкенд без индекса: ищет через LIKE, методы обновления пусты.
+
+    search_posts/search_comments оставляют в queryset только найденные
+    объекты и добавляют аннотацию search_rank (больше — релевантнее);
+    filter_posts/filter_comments только фильтруют, для админки.
+    """
+
+    def index_post(self, post):
+        pass
+
+    def delete_post(self, post_id):
+        pass
+
+    def index_comment(self, comment):
+        pass
+
+    def delete_comment(self, comment_id):
+        pass
+
+    def delete_posts(self, post_ids):
+        for post_id in post_ids:
+            self.delete_post(post_id)
+
+    def delete_comments(self, comment_ids):
+        for comment_id in comment_ids:
+            self.delete_comment(comment_id)
+
+    def index_post_comments(self, post_id):
+        """Обновить тексты комментариев в индексе поста."""
+
+    def rebuild(self):
+        pass
+
+    @staticmethod
+    def nothing(queryset):
+        """Пустой результат для запроса без слов."""
+        return queryset.annotate(search_rank=Value(0.0, FloatField())).none()
+
+    def _search(self, queryset, query, fields):
+        tokens = TOKEN_RE.findall(query)
+        if not tokens:
+            return self.nothing(queryset)
+        for token in tokens:
+            condition = Q()
+            for field in fields:
+                condition |= Q(**{f'{field}__icontains': token})
+            queryset = queryset.filter(condition)
+        return queryset.annotate(search_rank=Value(0.0, FloatField()))
+
+    def search_posts(self, queryset, query):
+        return self._search(
+            queryset, query, ('title', 'text', 'comments__text')
+        ).distinct()
+
+    def search_comments(self, queryset, query):
+        return self._search(queryset, query, ('text',))
+
+    def filter_posts(self, queryset, query):
+        return self._search(queryset, query, ('title', 'text'))
+
+    def filter_comments(self, queryset, query):
+        return self.search_comments(queryset, query)
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """Таблицы FTS5; строка поста хранит и тексты его комментариев.
+
+    Поэтому поиск постов с учётом комментариев присоединяет один индекс,
+    а запись комментария переписывает столбец comments его поста.
+    """
+
+    # Совпадение в заголовке весит больше, чем в тексте, а в тексте —
+    # больше, чем в комментариях.
+    post_weights = (10.0, 1.0, 0.5)
+
+    @staticmethod
+    def match_expression(query, columns=None):
+        """Запрос пользователя в синтаксисе FTS5: все слова, по префиксу."""
+        tokens = TOKEN_RE.findall(query)
+        if not tokens:
+            return ''
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        if columns:
+            match = f'{{{" ".join(columns)}}} : ({match})'
+        return match
+
+    def _replace(self, table, columns, pk, values):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [pk])
+            placeholders = ', '.join(['%s'] * (len(columns) + 1))
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {", ".join(columns)}) '
+                f'VALUES ({placeholders})',
+                [pk, *values]
+            )
+
+    def _delete(self, table, pks):
+        if not pks:
+            return
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE rowid IN ({placeholders})',
+                list(pks)
+            )
+
+    def index_post(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {POST_INDEX_TABLE} WHERE rowid = %s', [post.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {POST_INDEX_TABLE} '
+                '(rowid, title, text, comments) '
+                f'SELECT %s, %s, %s, ({POST_COMMENTS_SQL})',
+                [post.pk, post.title, post.text, post.pk]
+            )
+
+    def delete_post(self, post_id):
+        self._delete(POST_INDEX_TABLE, [post_id])
+
+    def delete_posts(self, post_ids):
+        self._delete(POST_INDEX_TABLE, post_ids)
+
+    def index_comment(self, comment):
+        self._replace(
+            COMMENT_INDEX_TABLE, ('text',), comment.pk, (comment.text,)
+        )
+
+    def delete_comment(self, comment_id):
+        self._delete(COMMENT_INDEX_TABLE, [comment_id])
+
+    def delete_comments(self, comment_ids):
+        self._delete(COMMENT_INDEX_TABLE, comment_ids)
+
+    def index_post_comments(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {POST_INDEX_TABLE} '
+                f'SET comments = ({POST_COMMENTS_SQL}) WHERE rowid = %s',
+                [post_id, post_id]
+            )
+
+    def rebuild(self):
+        comments_sql = POST_COMMENTS_SQL.replace('%s', 'blog_post.id')
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {POST_INDEX_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {POST_INDEX_TABLE} '
+                '(rowid, title, text, comments) '
+                f'SELECT id, title, text, ({comments_sql}) FROM blog_post'
+            )
+            cursor.execute(f'DELETE FROM {COMMENT_INDEX_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {COMMENT_INDEX_TABLE} (rowid, text) '
+                'SELECT id, text FROM blog_comment'
+            )
+
+    def _search(self, queryset, query, table, rank_sql, columns=None):
+        match = self.match_expression(query, columns)
+        if not match:
+            return self.nothing(queryset)
+        if rank_sql is None:
+            return queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s', (match,)
+            ))
+        # Таблица индекса присоединяется к запросу один раз: поиск по
+        # индексу выполняется однократно и для COUNT, и для сортировки.
+        # bm25() тем меньше, чем документ релевантнее.
+        alias = queryset.model._meta.db_table
+        return queryset.extra(
+            select={'search_rank': f'-{rank_sql}'},
+            tables=[table],
+            where=[f'{table} MATCH %s', f'{table}.rowid = {alias}.id'],
+            params=[match]
+        )
+
+    def _post_rank_sql(self):
+        weights = ', '.join(str(weight) for weight in self.post_weights)
+        return f'bm25({POST_INDEX_TABLE}, {weights})'
+
+    def search_posts(self, queryset, query):
+        return self._search(
+            queryset, query, POST_INDEX_TABLE, self._post_rank_sql()
+        )
+
+    def search_comments(self, queryset, query):
+        return self._search(
+            queryset, query, COMMENT_INDEX_TABLE,
+            f'bm25({COMMENT_INDEX_TABLE})'
+        )
+
+    def filter_posts(self, queryset, query):
+        return self._search(
+            queryset, query, POST_INDEX_TABLE, None, ('title', 'text')
+        )
+
+    def filter_comments(self, queryset, query):
+        return self._search(queryset, query, COMMENT_INDEX_TABLE, None)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Поиск по столбцам search_vector постов и комментариев.
+
+    Столбцы вычисляет сама СУБД (GENERATED ... STORED), поэтому сигналы
+    для них не нужны; по ним построены индексы GIN. Пост, найденный
+    только по комментариям, получает нулевой ранг.
+    """
+
+    config = 'russian'
+
+    def _search(self, queryset, query, rank, with_comments=False):
+        if not TOKEN_RE.search(query):
+            return self.nothing(queryset)
+        alias = queryset.model._meta.db_table
+        search_query = f"websearch_to_tsquery('{self.config}', %s)"
+        condition = f'{alias}.search_vector @@ {search_query}'
+        params = [query]
+        if with_comments:
+            condition = (
+                f'({condition} OR {alias}.id IN ('
+                'SELECT post_id FROM blog_comment '
+                f'WHERE blog_comment.search_vector @@ {search_query}))'
+            )
+            params.append(query)
+        queryset = queryset.extra(where=[condition], params=params)
+        if not rank:
+            return queryset
+        return queryset.extra(
+            select={
+                'search_rank': f'ts_rank({alias}.search_vector, '
+                               f'{search_query})'
+            },
+            select_params=[query]
+        )
+
+    def search_posts(self, queryset, query):
+        return self._search(queryset, query, True, with_comments=True)
+
+    def search_comments(self, queryset, query):
+        return self._search(queryset, query, True)
+
+    def filter_posts(self, queryset, query):
+        return self._search(queryset, query, False)
+
+    def filter_comments(self, queryset, query):
+        return self._search(queryset, query, False)
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        else:
+            _backend = BACKENDS.get(connection.vendor, BaseSearchBackend)()
+    return _backend
+
+
+def search_posts(queryset, query):
+    """Найденные посты, от более релевантных к менее."""
+    return get_backend().search_posts(queryset, query).order_by(
+        '-search_rank', '-pub_date', '-id'
+    )
+
+
+def search_comments(queryset, query):
+    return get_backend().search_comments(queryset, query).order_by(
+        '-search_rank', '-created_at', '-id'
+    )
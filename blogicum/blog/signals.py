@@ -0,0 +1,152 @@
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    bump_card_generation,
+    bump_feed_generation,
+    invalidate_post_counts
+)
+from .models import (
+    Category,
+    Comment,
+    Location,
+    Post,
+    make_excerpt,
+    render_text_html
+)
+from .images import read_image_info, schedule_derivatives
+from .search import get_backend
+
+User = get_user_model()
+
+# Посты, которые удаляются прямо сейчас: их комментарии уходят каскадом
+# раньше самих постов, и счётчик исчезающей строки обновлять незачем.
+_deleting_posts = ContextVar('deleting_posts', default=frozenset())
+
+
+@receiver(pre_save, sender=Post)
+def fill_derived_fields(sender, instance, raw, **kwargs):
+    # pre_save срабатывает и при loaddata, в отличие от Post.save().
+    instance.excerpt = make_excerpt(instance.text)
+    instance.text_html = render_text_html(instance.text)
+    # auto_now не заполняется при загрузке фикстур.
+    if raw and instance.updated_at is None:
+        instance.updated_at = timezone.now()
+
+
+@receiver(pre_save, sender=Post)
+def fill_image_info(sender, instance, **kwargs):
+    image = instance.image
+    # Новое фото сохраняется в хранилище позже, при записи модели.
+    instance._image_uploaded = bool(image) and not image._committed
+    if instance._image_uploaded:
+        instance.image_info = read_image_info(image)
+        # Хранилище возьмёт имя файла из этого хэша, не читая файл снова.
+        image.file.sha256 = instance.image_info['sha256']
+    elif not image:
+        instance.image_info = {}
+
+
+@receiver(post_save, sender=Post)
+def process_uploaded_image(sender, instance, **kwargs):
+    if getattr(instance, '_image_uploaded', False):
+        schedule_derivatives(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_post_counts(sender, **kwargs):
+    invalidate_post_counts()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_feeds(sender, **kwargs):
+    bump_feed_generation()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_post_cards(sender, **kwargs):
+    bump_card_generation()
+
+
+@receiver(post_save, sender=User)
+def invalidate_feeds_on_user_change(sender, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login — ленты не меняются.
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    bump_feed_generation()
+    bump_card_generation()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'title', 'text'} & set(update_fields):
+        return
+    get_backend().index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_backend().delete_post(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, update_fields=None, **kwargs):
+    if update_fields and 'text' not in update_fields:
+        return
+    backend = get_backend()
+    backend.index_comment(instance)
+    backend.index_post_comments(instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    backend = get_backend()
+    backend.delete_comment(instance.pk)
+    if instance.post_id not in _deleting_posts.get():
+        backend.index_post_comments(instance.post_id)
+
+
+@receiver(pre_delete, sender=Post)
+def mark_post_deleting(sender, instance, **kwargs):
+    _deleting_posts.set(_deleting_posts.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Post)
+def unmark_post_deleting(sender, instance, **kwargs):
+    _deleting_posts.set(_deleting_posts.get() - {instance.pk})
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw, **kwargs):
+    # В фикстурах comment_count уже посчитан.
+    if created and not raw:
+        Post.change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    # Срабатывает и при каскадном удалении (например, автора комментария).
+    if instance.post_id not in _deleting_posts.get():
+        Post.change_comment_count(instance.post_id, -1)
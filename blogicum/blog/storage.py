@@ -0,0 +1,42 @@
+import hashlib
+import os
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, в котором имя файла — SHA-256 его содержимого.
+
+    post_images/photo.JPG сохраняется как post_images/ab/abcd….jpg.
+    Повторная загрузка того же фото не создаёт новый файл, а URL файла
+    никогда не меняет содержимое, поэтому его можно кэшировать навсегда.
+    Файлы не удаляются вместе с постами — на один файл может ссылаться
+    несколько постов; неиспользуемые удаляет команда collect_media.
+    Готовый SHA-256 можно передать в атрибуте sha256 сохраняемого файла.
+    """
+
+    def content_name(self, name, content):
+        # Хэш загруженного фото уже посчитан сигналом fill_image_info.
+        digest = getattr(content, 'sha256', None)
+        if digest is None:
+            digest = hashlib.sha256()
+            for chunk in content.chunks():
+                digest.update(chunk)
+            content.seek(0)
+            digest = digest.hexdigest()
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
@@ -0,0 +1,38 @@
+from django import template
+
+from blog.images import derivative_name
+
+register = template.Library()
+
+
+@register.simple_tag
+def elided_page_range(page_obj, on_each_side=2, on_ends=1):
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number, on_each_side=on_each_side, on_ends=on_ends
+    )
+
+
+@register.simple_tag(takes_context=True)
+def page_query(context, **params):
+    """Строка запроса текущей страницы с другими параметрами пагинации."""
+    query = context['request'].GET.copy()
+    for key in ('page', 'after', 'before'):
+        query.pop(key, None)
+    for key, value in params.items():
+        query[key] = value
+    return query.urlencode()
+
+
+@register.simple_tag
+def image_srcset(post):
+    """Атрибут srcset из уменьшенных копий фото поста и оригинала."""
+    info = post.image_info
+    if not info.get('widths'):
+        return ''
+    storage = post.image.storage
+    candidates = [
+        f'{storage.url(derivative_name(post.image.name, width))} {width}w'
+        for width in info['widths']
+    ]
+    candidates.append(f'{post.image.url} {info["width"]}w')
+    return ', '.join(candidates)
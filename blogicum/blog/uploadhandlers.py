@@ -0,0 +1,103 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, UnidentifiedImageError
+
+# Дальше этого объёма заголовок изображения при получении не ищем.
+HEADER_MAX_BYTES = 1024 * 1024
+
+
+def too_large_file_error():
+    return f'Файл больше {filesizeformat(settings.BLOG_UPLOAD_MAX_BYTES)}.'
+
+
+def too_many_pixels_error(width, height):
+    return (
+        f'Изображение {width}×{height} слишком большое: допускается '
+        f'не больше {settings.BLOG_UPLOAD_MAX_PIXELS} точек.'
+    )
+
+
+class RejectedUploadedFile(UploadedFile):
+    """Пустой файл на месте отброшенного; upload_error — причина отказа.
+
+    Поле формы blog.forms.LimitedImageField показывает её как ошибку.
+    """
+
+    def __init__(self, name, content_type, upload_error):
+        super().__init__(BytesIO(), name, content_type, 0)
+        self.upload_error = upload_error
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загружаемые файлы на диск по частям и отбрасывает лишние.
+
+    Запись прекращается, как только превышен BLOG_UPLOAD_MAX_BYTES или из
+    уже полученного заголовка видно, что в изображении больше
+    BLOG_UPLOAD_MAX_PIXELS точек; само изображение при этом не
+    декодируется. Остаток файла пропускается, а в request.FILES попадает
+    RejectedUploadedFile, чтобы форма сообщила об ошибке, а не сохранила
+    объект без файла.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header_checked = False
+        self.error = None
+
+    def reject(self, error):
+        self.error = error
+        # Временный файл удаляется при закрытии.
+        self.file.close()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error:
+            return None
+        self.received += len(raw_data)
+        if self.received > settings.BLOG_UPLOAD_MAX_BYTES:
+            self.reject(too_large_file_error())
+            return None
+        super().receive_data_chunk(raw_data, start)
+        if not self.header_checked and self.received <= HEADER_MAX_BYTES:
+            error = self.check_header()
+            if error:
+                self.reject(error)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.error and not self.header_checked:
+            error = self.check_header()
+            if error:
+                self.reject(error)
+        if self.error:
+            return RejectedUploadedFile(
+                self.file_name, self.content_type, self.error
+            )
+        return super().file_complete(file_size)
+
+    def check_header(self):
+        """Вернуть причину отказа, если по заголовку видно, что фото велико."""
+        position = self.file.tell()
+        self.file.flush()
+        self.file.seek(0)
+        try:
+            # Image.open читает только заголовок, без декодирования.
+            with Image.open(self.file) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            self.header_checked = True
+            return 'Изображение слишком большое.'
+        except (UnidentifiedImageError, OSError, SyntaxError):
+            # Заголовок ещё не получен целиком или это не изображение —
+            # второе проверит поле формы.
+            return None
+        finally:
+            self.file.seek(position)
+        self.header_checked = True
+        if width * height > settings.BLOG_UPLOAD_MAX_PIXELS:
+            return too_many_pixels_error(width, height)
+        return None
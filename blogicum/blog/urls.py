@@ -3,6 +3,7 @@ from django.urls import path
 from .views import (
     CategoryListView,
     CommentCreateView,
+    CommentListView,
     CommentUpdateView,
     CommentDeleteView,
     PostListView,
@@ -12,6 +13,7 @@ from .views import (
     PostDeleteView,
     ProfileListView,
     ProfileUpdateView,
+    SearchView,
 )
 
 app_name = 'blog'
@@ -47,6 +49,11 @@ urlpatterns = [
         CommentCreateView.as_view(),
         name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        CommentListView.as_view(),
+        name='comments'
+    ),
     path(
         'posts/<int:post_id>/edit_comment/<comment_id>/',
         CommentUpdateView.as_view(),
@@ -67,6 +74,11 @@ urlpatterns = [
         ProfileListView.as_view(),
         name='profile'
     ),
+    path(
+        'search/',
+        SearchView.as_view(),
+        name='search'
+    ),
     path(
         'edit_profile/',
         ProfileUpdateView.as_view(),
@@ -1,35 +1,80 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.paginator import Paginator
-from django.http import Http404
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.urls import reverse_lazy, reverse
 from django.views.generic import (
     DetailView,
     UpdateView,
     ListView,
     CreateView,
-    DeleteView
+    DeleteView,
+    TemplateView
 )
 
+from .cache import PUBLISHED_POSTS_COUNT_KEY
 from .forms import UserForm, PostForm, CommentForm
 from .models import User, Post, Category, Comment
+from .search import search_posts
+from .views_counter import record_view
 from .mixin import (
+    CachedCountMixin,
+    ConditionalGetMixin,
     CommentSuccessUrlMixin,
+    CursorPaginationMixin,
+    FeedCacheMixin,
     OnlyAuthorMixin,
+    PostCardCacheMixin,
+    PostCommentsMixin,
     PostMixin,
-    PostFormMixin
+    PostFormMixin,
+    ReplicaReadMixin
 )
 
 
-class PostListView(ListView):
+class PostListView(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    FeedCacheMixin,
+    CursorPaginationMixin,
+    CachedCountMixin,
+    ListView
+):
     model = Post
     template_name = 'blog/index.html'
-    ordering = '-pub_date'
     paginate_by = 10
+    count_cache_key = PUBLISHED_POSTS_COUNT_KEY
+
+    def get_queryset(self):
+        return Post.published_posts.for_feed()
+
+
+class SearchView(
+    ReplicaReadMixin, ConditionalGetMixin, PostCardCacheMixin, ListView
+):
+    """Поиск по опубликованным постам и комментариям к ним.
+
+    Посты идут от более релевантных к менее; совпадение только в
+    комментариях весит меньше совпадения в самом посте.
+    """
+
+    template_name = 'blog/search.html'
+    paginate_by = 10
+
+    @cached_property
+    def query(self):
+        return self.request.GET.get('q', '').strip()
 
     def get_queryset(self):
-        return Post.published_posts.all()
+        if not self.query:
+            return Post.published_posts.none()
+        return search_posts(Post.published_posts.for_feed(), self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
 
 
 class PostCreateView(PostMixin, PostFormMixin, CreateView):
@@ -42,29 +87,42 @@ class PostCreateView(PostMixin, PostFormMixin, CreateView):
         )
 
 
-class PostDetailView(DetailView):
+class PostDetailView(
+    ReplicaReadMixin, ConditionalGetMixin, PostCommentsMixin, DetailView
+):
     model = Post
     template_name = 'blog/detail.html'
 
-    def get_object(self, **kwargs):
-        post = get_object_or_404(Post, pk=self.kwargs.get('post_id'))
-        if post.author == self.request.user:
-            return post
-        return get_object_or_404(
-            Post.published_posts,
-            pk=self.kwargs.get('post_id')
-        )
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        # Ответ 304 — тоже просмотр, просто из кэша браузера.
+        record_view(self.kwargs['post_id'])
+        return response
+
+    def get_object(self, queryset=None):
+        return self.get_visible_post()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['post'] = self.get_object()
-        context['comments'] = (
-            self.object.comments.select_related('author')
-        )
+        context['comments'] = self.get_comments_page(self.object)
         context['form'] = CommentForm()
         return context
 
 
+class CommentListView(
+    ReplicaReadMixin, ConditionalGetMixin, PostCommentsMixin, TemplateView
+):
+    """Следующая страница комментариев для подгрузки на странице поста."""
+
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = self.get_visible_post()
+        context['comments'] = self.get_comments_page(context['post'])
+        return context
+
+
 class PostUpdateView(
     OnlyAuthorMixin,
     PostMixin,
@@ -101,7 +159,9 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         if form.is_valid():
             form.instance.author = self.request.user
             form.instance.post = post
-            form.save()
+            # Вместе с комментарием сигнал обновляет comment_count поста.
+            with transaction.atomic():
+                form.save()
         return redirect(self.get_success_url())
 
     def get_success_url(self):
@@ -129,57 +189,65 @@ class CommentDeleteView(OnlyAuthorMixin, CommentSuccessUrlMixin, DeleteView):
         return context
 
 
-class CategoryListView(ListView):
+class CategoryListView(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    FeedCacheMixin,
+    CursorPaginationMixin,
+    ListView
+):
     model = Category
     paginate_by = 10
     template_name = 'blog/category.html'
 
-    def get_object(self):
-        category = get_object_or_404(
-            Category, slug=self.kwargs['category_slug']
+    @cached_property
+    def category(self):
+        return get_object_or_404(
+            Category,
+            slug=self.kwargs['category_slug'],
+            is_published=True
         )
-        if not category.is_published:
-            raise Http404()
-        return category
 
     def get_queryset(self):
-        page_obj = Post.objects.filter(
-            category=self.get_object(),
+        return Post.objects.filter(
+            category=self.category,
             is_published=True,
             pub_date__lte=timezone.now()
-        ).order_by('-pub_date')
-        return page_obj
+        ).for_feed().order_by('-pub_date', '-id')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = self.get_object()
-        paginator = Paginator(self.get_queryset(), 10)
-        page_obj = paginator.get_page(self.request.GET.get('page'))
-        context['page_obj'] = page_obj
+        context['category'] = self.category
         return context
 
 
-class ProfileListView(ListView):
+class ProfileListView(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    FeedCacheMixin,
+    CursorPaginationMixin,
+    ListView
+):
     model = User
+    paginate_by = 10
     template_name = 'blog/profile.html'
 
-    def get_object(self, **kwargs):
+    @cached_property
+    def profile(self):
         return get_object_or_404(User, username=self.kwargs['username'])
 
     def get_queryset(self):
-        if self.request.user == self.get_object():
+        if self.request.user == self.profile:
             return Post.objects.filter(
-                author_id=self.get_object().id,
-            )
+                author=self.profile,
+            ).for_feed().order_by('-pub_date', '-id')
         return Post.published_posts.filter(
-            author_id=self.get_object().id,
-        )
+            author=self.profile,
+        ).for_feed()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = self.get_object()
-        paginator = Paginator(self.get_queryset().order_by('-pub_date'), 10)
-        context['page_obj'] = paginator.get_page(self.request.GET.get('page'))
+        context['profile'] = self.profile
         return context
 
 
@@ -0,0 +1,111 @@
+"""Счётчик просмотров постов с отложенной записью.
+
+Просмотры копятся в памяти процесса и записываются фоновым потоком раз
+в BLOG_VIEWS_FLUSH_INTERVAL секунд: на каждое встретившееся число
+просмотров n — один UPDATE ... SET views = views + n для всех таких
+постов. Горячая строка популярного поста обновляется не на каждый
+просмотр, а раз за интервал. При аварийном завершении процесса теряются
+просмотры не более чем за интервал; при обычном — буфер записывается
+в atexit.
+"""
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Сколько постов обновлять одним UPDATE.
+BATCH_SIZE = 500
+
+_pending = Counter()
+_lock = threading.Lock()
+_flusher = None
+
+
+def record_view(post_id):
+    """Учесть просмотр поста; в базу он попадёт при следующей записи."""
+    with _lock:
+        _pending[post_id] += 1
+        overflow = len(_pending) >= settings.BLOG_VIEWS_MAX_PENDING
+    if overflow:
+        try:
+            flush_views()
+        except DatabaseError:
+            # Просмотры остались в буфере; страница из-за них не падает.
+            logger.exception('Не удалось записать просмотры постов')
+    elif settings.BLOG_VIEWS_FLUSH_INTERVAL:
+        start_flusher()
+
+
+def pending_views():
+    with _lock:
+        return dict(_pending)
+
+
+def flush_views():
+    """Записать накопленные просмотры в базу; вернуть их число."""
+    with _lock:
+        pending = _pending.copy()
+        _pending.clear()
+    if not pending:
+        return 0
+    post_ids_by_views = defaultdict(list)
+    for post_id, views in pending.items():
+        post_ids_by_views[views].append(post_id)
+    try:
+        with transaction.atomic():
+            for views, post_ids in post_ids_by_views.items():
+                for start in range(0, len(post_ids), BATCH_SIZE):
+                    Post.objects.filter(
+                        pk__in=post_ids[start:start + BATCH_SIZE]
+                    ).update(views=F('views') + views)
+    except DatabaseError:
+        # Вернуть просмотры в буфер до следующей попытки.
+        with _lock:
+            _pending.update(pending)
+        raise
+    return sum(pending.values())
+
+
+def _flush_periodically(stop):
+    while not stop.wait(settings.BLOG_VIEWS_FLUSH_INTERVAL):
+        try:
+            flush_views()
+        except DatabaseError:
+            logger.exception('Не удалось записать просмотры постов')
+        finally:
+            connections.close_all()
+
+
+def _flush_at_exit(stop):
+    stop.set()
+    try:
+        flush_views()
+    except DatabaseError:
+        logger.exception('Просмотры постов при завершении потеряны')
+
+
+def start_flusher():
+    """Запустить фоновую запись просмотров, если она ещё не запущена."""
+    global _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is not None:
+            return
+        stop = threading.Event()
+        _flusher = threading.Thread(
+            target=_flush_periodically,
+            args=(stop,),
+            name='blog-views',
+            daemon=True
+        )
+        _flusher.start()
+    atexit.register(_flush_at_exit, stop)
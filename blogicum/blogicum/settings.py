@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +40,7 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -78,9 +80,76 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переиспользуется между запросами, секунды
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Поколения лент, закэшированные страницы и числа постов должны быть общими
+# для всех процессов сервера, иначе изменение видно только процессу, который
+# его сделал. Основной вариант — Memcached (пакет pymemcache), адрес задаёт
+# переменная окружения MEMCACHED_LOCATION, например 127.0.0.1:11211.
+MEMCACHED_LOCATION = os.environ.get('MEMCACHED_LOCATION')
+if MEMCACHED_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': MEMCACHED_LOCATION,
+        }
+    }
+else:
+    # Запасной вариант для разработки: файловый кэш общий только для
+    # процессов одной машины. Каждая запись в нём просматривает каталог
+    # кэша, а при переполнении удаляет случайную треть файлов — вместе
+    # с поколениями лент, после чего все страницы строятся заново.
+    # Поэтому MAX_ENTRIES небольшой, а для продакшена нужен Memcached.
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get(
+                'FILE_CACHE_DIR',
+                os.path.join(tempfile.gettempdir(), 'blogicum_cache')
+            ),
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000,
+            },
+        }
+    }
+
+# Число процессов сервера (gunicorn читает ту же переменную окружения).
+# Кэш в памяти процесса при нескольких процессах запрещает проверка core
+SERVER_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Псевдонимы баз из DATABASES, с которых читают ленты и страницы постов.
+# Например, для второй базы, которую наполняет репликация основной:
+# DATABASES['replica'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': BASE_DIR / 'replica.sqlite3',
+#     'TEST': {'MIRROR': 'default'},
+# }
+# DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Сколько секунд после изменяющего запроса пользователь читает
+# с основной базы, а не с реплик; столько же после изменения лент
+# страницы, прочитанные с реплик, не кэшируются и не получают ETag
+REPLICA_PIN_SECONDS = 10
+
+# PRAGMA, которые core.db выполняет на каждом новом соединении с SQLite.
+# В режиме WAL читатели не ждут писателей; synchronous=NORMAL в WAL
+# не портит базу при сбое, но может потерять последние транзакции
+# при отключении питания
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -118,6 +187,13 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR / 'static')]
 
+# Сюда collectstatic собирает статику с хэшами в именах и сжатыми копиями
+STATIC_ROOT = BASE_DIR / 'static_root'
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Срок кэширования статики без хэша в имени, секунды
+STATIC_CACHE_MAX_AGE = 60 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -135,3 +211,73 @@ LOGOUT_REDIRECT_URL = 'blog:index'
 # Директория для сохранения изображений
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
+
+# Отдача загруженных файлов фронтенд-сервером (core.views.serve_media):
+# None — Django отдаёт файлы сам, 'x-accel-redirect' — nginx,
+# 'x-sendfile' — Apache/lighttpd с mod_xsendfile
+MEDIA_SENDFILE_BACKEND = None
+
+# Внутренний location nginx, который смотрит в MEDIA_ROOT
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Файлы, содержимое которых по этому имени никогда не меняется (фото
+# постов с адресацией по содержимому и их копии), кэшируются навсегда
+MEDIA_IMMUTABLE_PATHS = [
+    r'^post_images/[0-9a-f]{2}/[0-9a-f]{64}\.',
+]
+
+# Срок кэширования остальных загруженных файлов, секунды
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
+# Курсорная пагинация лент (?after=/?before=) вместо ?page=N
+BLOG_CURSOR_PAGINATION = False
+
+# Время жизни закэшированного числа постов для пагинатора, секунды
+BLOG_COUNT_CACHE_TIMEOUT = 60
+
+# Время жизни закэшированных страниц лент для анонимных посетителей, секунды
+BLOG_FEED_CACHE_TIMEOUT = 300
+
+# Время жизни закэшированных карточек постов (includes/post_card.html), секунды
+BLOG_POST_CARD_CACHE_TIMEOUT = 3600
+
+# Сколько комментариев показывать на странице поста и подгружать за раз
+BLOG_COMMENTS_PER_PAGE = 50
+
+# Класс бэкенда поиска (blog.search); None — выбрать по СУБД
+BLOG_SEARCH_BACKEND = None
+
+# Ширины уменьшенных копий фото постов в WebP, пиксели
+BLOG_IMAGE_WIDTHS = (320, 640, 960, 1280)
+
+# Качество WebP для уменьшенных копий
+BLOG_IMAGE_QUALITY = 80
+
+# Сколько потоков веб-процесса генерирует уменьшенные копии; 0 — сразу
+# в процессе запроса после фиксации транзакции, None — только командой
+# generate_image_derivatives (например, по cron). Потоки отнимают
+# процессор у запросов, поэтому их немного
+BLOG_IMAGE_WORKERS = 1
+
+# Сколько фото может ждать в очереди пула; остальные обработает
+# generate_image_derivatives
+BLOG_IMAGE_MAX_PENDING = 20
+
+# Как часто фоновый поток записывает накопленные просмотры постов,
+# секунды; столько просмотров теряется при аварийном завершении процесса.
+# None — не запускать поток (просмотры пишет blog.views_counter.flush_views)
+BLOG_VIEWS_FLUSH_INTERVAL = 10
+
+# При стольких постах с незаписанными просмотрами буфер записывается сразу
+BLOG_VIEWS_MAX_PENDING = 1000
+
+# Загружаемые файлы пишутся на диск по частям с проверкой ограничений
+FILE_UPLOAD_HANDLERS = [
+    'blog.uploadhandlers.LimitedTemporaryFileUploadHandler',
+]
+
+# Наибольший объём загружаемого фото, байты
+BLOG_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+# Наибольшее число точек в загружаемом фото
+BLOG_UPLOAD_MAX_PIXELS = 40_000_000
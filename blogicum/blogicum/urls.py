@@ -1,10 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include, reverse_lazy
 from django.conf import settings
-from django.conf.urls.static import static
 from django.views.generic import CreateView
 from django.contrib.auth.forms import UserCreationForm
 
+from core.views import serve_media, serve_static
+
 handler403 = 'pages.views.csrf_failure'
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.iternal_server_error'
@@ -23,7 +24,17 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls', namespace='pages')),
     path('', include('blog.urls', namespace='blog')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(
+        f'{settings.MEDIA_URL.lstrip("/")}<path:path>',
+        serve_media,
+        name='media'
+    ),
+    path(
+        f'{settings.STATIC_URL.lstrip("/")}<path:path>',
+        serve_static,
+        name='static'
+    ),
+]
 
 # Если проект запущен в режиме разработки...
 # if settings.DEBUG:
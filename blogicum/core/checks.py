@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Кэш в памяти процесса не годится, если процессов сервера несколько."""
+    if settings.SERVER_WORKERS <= 1:
+        return []
+    if not isinstance(caches['default'], LocMemCache):
+        return []
+    return [Error(
+        'Кэш по умолчанию хранится в памяти процесса, а процессов сервера '
+        f'{settings.SERVER_WORKERS}: сброс кэша лент в одном процессе не '
+        'виден остальным.',
+        hint='Укажите в CACHES общий кэш: файловый, Memcached или Redis.',
+        obj='CACHES',
+        id='core.E001',
+    )]
@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import apply_sqlite_pragmas
+
+# Python по умолчанию ждёт снятия блокировки 5 секунд — как и Django.
+DEFAULT_TIMEOUT = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает конкурентное чтение и запись в SQLite без PRAGMA и с '
+        'SQLITE_PRAGMAS. Замер идёт на временной базе, рабочая не меняется.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=4,
+            help='Сколько потоков читают ленту.'
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=2,
+            help='Сколько потоков добавляют комментарии.'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Длительность каждого замера, секунды.'
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Сколько строк добавить в таблицу перед замером.'
+        )
+
+    def handle(self, *args, **options):
+        profiles = {
+            'Без PRAGMA': {},
+            'SQLITE_PRAGMAS': settings.SQLITE_PRAGMAS,
+        }
+        for title, pragmas in profiles.items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self.seed(path, pragmas, options['rows'])
+                result = self.run(path, pragmas, options)
+            self.report(title, result, options['duration'])
+
+    def connect(self, path, pragmas):
+        db = sqlite3.connect(
+            path,
+            timeout=DEFAULT_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        apply_sqlite_pragmas(db, pragmas)
+        return db
+
+    def seed(self, path, pragmas, rows):
+        db = self.connect(path, pragmas)
+        db.execute(
+            'CREATE TABLE comment ('
+            'id INTEGER PRIMARY KEY, post_id INTEGER, text TEXT, '
+            'created_at REAL)'
+        )
+        db.execute('CREATE INDEX comment_post ON comment (post_id, id)')
+        db.execute('BEGIN')
+        db.executemany(
+            'INSERT INTO comment (post_id, text, created_at) '
+            'VALUES (?, ?, ?)',
+            ((i % 100, 'Текст комментария' * 5, time.time())
+             for i in range(rows))
+        )
+        db.execute('COMMIT')
+        db.close()
+
+    def run(self, path, pragmas, options):
+        counters = {'reads': [], 'writes': [], 'errors': []}
+        deadline = time.monotonic() + options['duration']
+
+        def reader():
+            db = self.connect(path, pragmas)
+            done = 0
+            while time.monotonic() < deadline:
+                db.execute(
+                    'SELECT * FROM comment WHERE post_id = ? '
+                    'ORDER BY id DESC LIMIT 50',
+                    (done % 100,)
+                ).fetchall()
+                done += 1
+            db.close()
+            counters['reads'].append(done)
+
+        def writer():
+            db = self.connect(path, pragmas)
+            done = errors = 0
+            while time.monotonic() < deadline:
+                try:
+                    # Как сохранение комментария: вставка и обновление
+                    # счётчика в одной транзакции.
+                    db.execute('BEGIN IMMEDIATE')
+                    db.execute(
+                        'INSERT INTO comment (post_id, text, created_at) '
+                        'VALUES (?, ?, ?)',
+                        (done % 100, 'Новый комментарий', time.time())
+                    )
+                    db.execute(
+                        'UPDATE comment SET text = text WHERE id = ?',
+                        (done + 1,)
+                    )
+                    db.execute('COMMIT')
+                    done += 1
+                except sqlite3.OperationalError:
+                    errors += 1
+                    if db.in_transaction:
+                        db.execute('ROLLBACK')
+            db.close()
+            counters['writes'].append(done)
+            counters['errors'].append(errors)
+
+        threads = [
+            threading.Thread(target=reader)
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=writer)
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {name: sum(values) for name, values in counters.items()}
+
+    def report(self, title, result, duration):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(f'Чтений в секунду: {result["reads"] / duration:.0f}')
+        self.stdout.write(
+            f'Записей в секунду: {result["writes"] / duration:.0f}'
+        )
+        self.stdout.write(f'Ошибок блокировки: {result["errors"]}')
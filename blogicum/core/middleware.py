@@ -0,0 +1,38 @@
+from django.conf import settings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+PIN_COOKIE_NAME = 'pin_primary'
+
+
+def is_pinned_to_primary(request):
+    """Должен ли запрос читать с основной базы, а не с реплик."""
+    return (
+        request.method not in SAFE_METHODS
+        or PIN_COOKIE_NAME in request.COOKIES
+    )
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет пользователя за основной базой на время отставания реплик.
+
+    Изменяющие запросы (POST и т. п.) ставят cookie на REPLICA_PIN_SECONDS
+    секунд; пока она есть, страницы, которые читают с реплик
+    (blog.mixin.ReplicaReadMixin), читают с основной базы, и после
+    комментария или правки поста пользователь видит результат, даже если
+    реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
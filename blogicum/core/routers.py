@@ -0,0 +1,55 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DB = 'default'
+
+# Чтение в текущем контексте разрешено с реплик. По умолчанию выключено:
+# команды, фоновые потоки и изменяющие запросы читают с основной базы.
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_reads_enabled():
+    return _replica_reads.get()
+
+
+@contextmanager
+def read_from_replicas(enabled=True):
+    """Читать внутри блока с реплик из DATABASE_REPLICAS."""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def pin_to_primary():
+    """Читать внутри блока с основной базы, даже если реплики разрешены."""
+    return read_from_replicas(False)
+
+
+class PrimaryReplicaRouter:
+    """Запись — в default, чтение — с реплики только там, где разрешено.
+
+    С реплик читают лишь код внутри read_from_replicas() (страницы лент и
+    постов, blog.mixin.ReplicaReadMixin); всё остальное, включая команды
+    и фоновые потоки, читает с основной базы и не видит отставания реплик.
+    Схема реплик приходит репликацией, migrate по умолчанию работает
+    только с default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and replica_reads_enabled():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Все базы в DATABASES — основная и её копии.
+        if {obj1._state.db, obj2._state.db} <= set(settings.DATABASES):
+            return True
+        return None
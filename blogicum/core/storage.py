@@ -0,0 +1,69 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+# Пакет brotli указан в requirements.txt; без него collectstatic
+# пропускает .br и создаёт только .gz.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Уже сжатые форматы повторно не сжимаем.
+INCOMPRESSIBLE_EXTENSIONS = {
+    '.br', '.gz', '.zip', '.jpg', '.jpeg', '.png', '.gif', '.webp',
+    '.woff', '.woff2', '.mp4', '.webm',
+}
+# Сжатый вариант сохраняется, только если он заметно меньше исходного.
+MIN_COMPRESSION_RATIO = 0.95
+
+
+def compress(content):
+    """Пары (расширение, сжатое содержимое): gzip и, если есть, brotli."""
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content)))
+    return variants
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в именах и сжатыми копиями файлов.
+
+    collectstatic кладёт рядом с каждым файлом name.gz (и name.br, если
+    установлен пакет brotli) — их отдаёт core.views.serve_static или
+    фронтенд-сервер (gzip_static/brotli_static в nginx). Файлы, которых
+    нет в манифесте (например, до первого collectstatic), отдаются под
+    исходными именами, а не роняют страницу с ValueError.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if not dry_run and not isinstance(processed, Exception):
+                self.compress_files(name, hashed_name)
+            yield name, hashed_name, processed
+
+    def compress_files(self, *names):
+        for name in dict.fromkeys(filter(None, names)):
+            if os.path.splitext(name)[1].lower() in INCOMPRESSIBLE_EXTENSIONS:
+                continue
+            with self.open(name) as source:
+                content = source.read()
+            for extension, compressed in compress(content):
+                if len(compressed) >= len(content) * MIN_COMPRESSION_RATIO:
+                    continue
+                compressed_name = name + extension
+                if self.exists(compressed_name):
+                    self.delete(compressed_name)
+                self._save(compressed_name, ContentFile(compressed))
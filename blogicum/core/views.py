@@ -0,0 +1,247 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from django.views.decorators.vary import vary_on_headers
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+# Сжатые копии статики в порядке предпочтения.
+STATIC_ENCODINGS = (('.br', 'br'), ('.gz', 'gzip'))
+# Год — наибольший срок, который имеет смысл указывать в max-age.
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Словарь hashed_files загруженного манифеста и множество имён из него.
+_hashed_static_names = (None, frozenset())
+
+
+def parse_range(header, size):
+    """Вернуть (начало, конец) единственного диапазона или None.
+
+    Несколько диапазонов не поддерживаются — тогда отдаётся весь файл.
+    Для невыполнимого диапазона бросает ValueError.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # bytes=-N — последние N байт.
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def iter_range(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def is_immutable(path):
+    return any(
+        re.match(pattern, path) for pattern in settings.MEDIA_IMMUTABLE_PATHS
+    )
+
+
+def sendfile_response(path, full_path):
+    """Ответ, тело которого отправит фронтенд-сервер."""
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE_BACKEND == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        )
+    elif settings.MEDIA_SENDFILE_BACKEND == 'x-sendfile':
+        response['X-Sendfile'] = full_path
+    else:
+        raise ValueError(
+            'Неизвестный MEDIA_SENDFILE_BACKEND: '
+            f'{settings.MEDIA_SENDFILE_BACKEND!r}'
+        )
+    # Тип определит фронтенд-сервер по файлу.
+    del response['Content-Type']
+    return response
+
+
+def serve_file(request, full_path, max_age, immutable=False,
+               sendfile_path=None, content_type=None, content_encoding=None):
+    """Ответ с файлом: Range, ETag/Last-Modified и заголовки кэширования.
+
+    sendfile_path — путь для отдачи фронтенд-сервером, если задан
+    MEDIA_SENDFILE_BACKEND.
+    """
+    try:
+        stat_result = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404
+    size = stat_result.st_size
+    etag = f'"{stat_result.st_mtime_ns:x}-{size:x}"'
+    last_modified = int(stat_result.st_mtime)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        if sendfile_path and settings.MEDIA_SENDFILE_BACKEND:
+            # Range и отдачу байтов берёт на себя фронтенд-сервер.
+            response = sendfile_response(sendfile_path, full_path)
+        else:
+            response = build_file_response(
+                request, full_path, size, etag, last_modified,
+                content_type, content_encoding
+            )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if response.status_code == 416:
+        return response
+    if immutable:
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def build_file_response(request, full_path, size, etag, last_modified,
+                        content_type=None, content_encoding=None):
+    if content_type is None:
+        content_type, content_encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    range_header = request.headers.get('Range')
+    if range_header and (
+        if_range is None
+        or if_range == etag
+        or parse_http_date_safe(if_range) == last_modified
+    ):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            iter_range(file, start, length),
+            status=206,
+            content_type=content_type
+        )
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Загруженные файлы с поддержкой Range, ETag и отдачей через прокси.
+
+    Файлы, имена которых совпадают с MEDIA_IMMUTABLE_PATHS (содержимое
+    никогда не меняется), кэшируются на год; остальные —
+    на MEDIA_CACHE_MAX_AGE секунд с проверкой по ETag.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    return serve_file(
+        request,
+        full_path,
+        settings.MEDIA_CACHE_MAX_AGE,
+        immutable=is_immutable(path),
+        sendfile_path=path
+    )
+
+
+def find_static(path):
+    """Путь к файлу статики в STATIC_ROOT, а до collectstatic — в finders."""
+    if settings.STATIC_ROOT:
+        try:
+            full_path = safe_join(settings.STATIC_ROOT, path)
+        except SuspiciousFileOperation:
+            return None
+        if os.path.isfile(full_path):
+            return full_path
+    return finders.find(path)
+
+
+@require_safe
+@vary_on_headers('Accept-Encoding')
+def serve_static(request, path):
+    """Статика со сжатыми копиями из collectstatic по Accept-Encoding.
+
+    Запасной вариант на случай, когда статику не отдаёт фронтенд-сервер.
+    Файлы с хэшем содержимого в имени кэшируются на год.
+    """
+    full_path = find_static(path)
+    if full_path is None:
+        raise Http404
+    content_type, encoding = mimetypes.guess_type(full_path)
+    accepted = {
+        part.split(';')[0].strip()
+        for part in request.headers.get('Accept-Encoding', '').split(',')
+    }
+    if encoding is None:
+        for extension, name in STATIC_ENCODINGS:
+            if name in accepted and os.path.isfile(full_path + extension):
+                full_path += extension
+                encoding = name
+                break
+    return serve_file(
+        request,
+        full_path,
+        settings.STATIC_CACHE_MAX_AGE,
+        immutable=path in get_hashed_static_names(),
+        content_type=content_type,
+        content_encoding=encoding
+    )
+
+
+def get_hashed_static_names():
+    """Имена файлов с хэшем — строятся один раз на загрузку манифеста."""
+    global _hashed_static_names
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    manifest, names = _hashed_static_names
+    if manifest is not hashed_files:
+        names = frozenset(hashed_files.values())
+        _hashed_static_names = (hashed_files, names)
+    return names
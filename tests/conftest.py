@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -35,12 +36,55 @@ UrlRepr = NamedTuple("UrlRepr", [("url", str), ("repr", str)])
 TitledUrlRepr = TypeVar("TitledUrlRepr", bound=Tuple[UrlRepr, str])
 
 
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(
+        django_db_modify_db_settings_parallel_suffix
+):
+    # Отдельная база-«реплика», в которую ничего не реплицируется:
+    # чтение с неё видно по отсутствию данных основной базы.
+    from django.conf import settings
+
+    settings.DATABASES['replica'] = {
+        **settings.DATABASES['default'],
+        'NAME': 'replica.sqlite3',
+    }
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_cache(tmp_path_factory):
+    # Свой файловый кэш: clear_cache не должен очищать кэш dev-сервера.
+    # Переменная окружения нужна процессам, которые запускают тесты.
+    location = str(tmp_path_factory.mktemp('cache'))
+    os.environ['FILE_CACHE_DIR'] = location
+    with override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': location,
+    }}):
+        yield
+
+
 @pytest.fixture(autouse=True)
 def enable_debug_false():
     with override_settings(DEBUG=False):
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def buffered_post_views(settings):
+    # Без фонового потока, который писал бы в тестовую базу.
+    from blog import views_counter
+
+    settings.BLOG_VIEWS_FLUSH_INTERVAL = None
+    yield
+    views_counter._pending.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,7 +407,13 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
                     os.remove(file_path)
+    # Подкаталоги, которые создаёт хранилище фото (post_images/ab/).
+    for root, dirs, files in os.walk(image_dir, topdown=False):
+        depth = len(Path(root).relative_to(image_dir).parts)
+        if depth >= 2 and not os.listdir(root):
+            os.rmdir(root)
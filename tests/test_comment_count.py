@@ -0,0 +1,137 @@
+import pytest
+from django.db import DatabaseError, transaction
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now()
+    )
+
+
+def comment_counts(posts):
+    counts = dict(Post.objects.values_list('id', 'comment_count'))
+    return [counts[post.id] for post in posts]
+
+
+def test_views_maintain_comment_count(user_client, posts):
+    post = posts[0]
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Второй'})
+    assert comment_counts(posts) == [2, 0], (
+        'Убедитесь, что добавление комментария увеличивает comment_count'
+        ' поста.'
+    )
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    assert comment_counts(posts) == [1, 0], (
+        'Убедитесь, что удаление комментария уменьшает comment_count поста.'
+    )
+
+
+def test_admin_maintains_comment_count(admin_client, user, posts):
+    first, second = posts
+    admin_client.post('/admin/blog/comment/add/', {
+        'text': 'Из админки', 'post': first.id, 'author': user.id,
+    })
+    assert comment_counts(posts) == [1, 0]
+    comment = Comment.objects.get()
+    admin_client.post(f'/admin/blog/comment/{comment.id}/change/', {
+        'text': 'Перенесён', 'post': second.id, 'author': user.id,
+    })
+    assert comment_counts(posts) == [0, 1], (
+        'Убедитесь, что при переносе комментария в другой пост в админке'
+        ' счётчики обоих постов обновляются.'
+    )
+    admin_client.post(
+        f'/admin/blog/comment/{comment.id}/delete/', {'post': 'yes'}
+    )
+    assert comment_counts(posts) == [0, 0]
+
+
+def test_admin_bulk_delete_maintains_comment_count(
+        admin_client, mixer, user, posts
+):
+    comments = mixer.cycle(3).blend('blog.Comment', post=posts[0])
+    Post.objects.filter(pk=posts[0].pk).update(comment_count=3)
+    admin_client.post('/admin/blog/comment/', {
+        'action': 'delete_selected',
+        '_selected_action': [comment.id for comment in comments[:2]],
+        'post': 'yes',
+    })
+    assert comment_counts(posts) == [1, 0], (
+        'Убедитесь, что массовое удаление комментариев в админке уменьшает'
+        ' comment_count постов.'
+    )
+
+
+def test_cascade_delete_maintains_comment_count(
+        mixer, django_user_model, user, posts
+):
+    other = mixer.blend(django_user_model)
+    mixer.blend('blog.Comment', post=posts[0], author=user)
+    mixer.blend('blog.Comment', post=posts[0], author=other)
+    other.delete()
+    assert comment_counts(posts) == [1, 0], (
+        'Убедитесь, что каскадное удаление комментариев (например, вместе'
+        ' с их автором) уменьшает comment_count поста.'
+    )
+
+
+def test_post_delete_keeps_other_counts(mixer, posts):
+    mixer.cycle(2).blend('blog.Comment', post=posts[0])
+    mixer.blend('blog.Comment', post=posts[1])
+    posts[0].delete()
+    mixer.blend('blog.Comment', post=posts[1])
+    posts[1].comments.first().delete()
+    assert comment_counts(posts[1:]) == [1], (
+        'Убедитесь, что удаление поста с комментариями не мешает вести'
+        ' comment_count остальных постов.'
+    )
+
+
+def test_recount_comments(capsys, mixer, posts):
+    mixer.cycle(2).blend('blog.Comment', post=posts[0])
+    Post.objects.filter(pk=posts[0].pk).update(comment_count=0)
+    Post.objects.filter(pk=posts[1].pk).update(comment_count=5)
+
+    call_command('recount_comments', dry_run=True)
+    assert 'Расхождений: 2' in capsys.readouterr().out
+    assert comment_counts(posts) == [0, 5], (
+        'Убедитесь, что recount_comments --dry-run ничего не меняет.'
+    )
+
+    call_command('recount_comments')
+    assert 'Расхождений: 2' in capsys.readouterr().out
+    assert comment_counts(posts) == [2, 0], (
+        'Убедитесь, что recount_comments исправляет comment_count.'
+    )
+    call_command('recount_comments')
+    assert 'Расхождений: 0' in capsys.readouterr().out
+
+
+def test_full_save_keeps_comment_count(mixer, posts):
+    post = Post.objects.get(pk=posts[0].pk)
+    mixer.blend('blog.Comment', post=post)
+    post.title = 'Новый заголовок'
+    post.save()
+    assert comment_counts(posts) == [1, 0], (
+        'Убедитесь, что полное сохранение поста не затирает comment_count.'
+    )
+
+
+def test_full_save_of_deleted_post_fails(posts):
+    post = Post.objects.get(pk=posts[0].pk)
+    Post.objects.filter(pk=post.pk).delete()
+    with pytest.raises(DatabaseError), transaction.atomic():
+        post.save()
+    assert not Post.objects.filter(pk=post.pk).exists(), (
+        'Убедитесь, что сохранение удалённого поста не создаёт его заново.'
+    )
@@ -0,0 +1,105 @@
+import base64
+from http import HTTPStatus
+
+import pytest
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_forward(client, url):
+    seen = []
+    response = client.get(url, {'after': ''})
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        page_obj = response.context['page_obj']
+        seen.append([post.id for post in page_obj])
+        if not page_obj.has_next():
+            return seen, page_obj
+        response = client.get(url, {'after': page_obj.next_cursor})
+
+
+@pytest.mark.parametrize('url_template', [
+    '/',
+    '/category/{category.slug}/',
+    '/profile/{user.username}/',
+])
+def test_cursor_pages_cover_feed(
+        user_client, user, published_category, url_template,
+        many_posts_with_published_locations
+):
+    url = url_template.format(category=published_category, user=user)
+    posts = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+    pages, last_page = _walk_forward(user_client, url)
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE], (
+        "Убедитесь, что курсорная пагинация отдаёт полные страницы."
+    )
+    assert sum(pages, []) == [post.id for post in posts], (
+        "Убедитесь, что курсорная пагинация проходит ленту без пропусков"
+        " и повторов в порядке «от новых к старым»."
+    )
+
+    response = user_client.get(url, {'before': last_page.previous_cursor})
+    assert [post.id for post in response.context['page_obj']] == pages[0], (
+        "Убедитесь, что ссылка на предыдущую страницу курсорной пагинации"
+        " возвращает предыдущую страницу."
+    )
+
+
+def raw_cursor(raw):
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor',
+    raw_cursor('2020-01-01T00:00:00+00:00|' + '9' * 30),
+    raw_cursor('2020-01-01T00:00:00+00:00|0'),
+    raw_cursor('2020-01-01T00:00:00+00:00|-5'),
+    raw_cursor('2020-01-01T00:00:00|5'),
+])
+def test_broken_cursor_falls_back_to_first_page(
+        user_client, many_posts_with_published_locations, cursor
+):
+    response = user_client.get('/', {'after': cursor})
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что некорректный курсор не приводит к ошибке сервера.'
+    )
+    page_obj = response.context['page_obj']
+    assert len(page_obj) == N_PER_PAGE
+    assert not page_obj.has_previous()
+
+
+def test_post_comments_are_loaded_by_pages(
+        unlogged_client, mixer, user, post_with_published_location,
+        settings
+):
+    settings.BLOG_COMMENTS_PER_PAGE = 3
+    post = post_with_published_location
+    comments = mixer.cycle(7).blend(
+        'blog.Comment', post=post, author=user
+    )
+    response = unlogged_client.get(f'/posts/{post.id}/')
+    assert response.status_code == HTTPStatus.OK
+    page = response.context['comments']
+    seen = [comment.id for comment in page]
+    assert len(seen) == 3, (
+        "Убедитесь, что на странице поста выводится только первая страница"
+        " комментариев."
+    )
+    while page.has_next():
+        response = unlogged_client.get(
+            f'/posts/{post.id}/comments/', {'after': page.next_cursor}
+        )
+        assert response.status_code == HTTPStatus.OK
+        page = response.context['comments']
+        seen += [comment.id for comment in page]
+    expected = sorted(comments, key=lambda c: (c.created_at, c.id))
+    assert seen == [comment.id for comment in expected], (
+        "Убедитесь, что подгрузка комментариев проходит их все по порядку"
+        " без пропусков и повторов."
+    )
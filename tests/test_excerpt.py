@@ -0,0 +1,55 @@
+import pytest
+from django.core.management import call_command
+from django.template import Context, Template
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = (
+    'Первое второе третье четвёртое пятое шестое седьмое восьмое девятое'
+    ' десятое одиннадцатое двенадцатое'
+)
+
+
+def truncatewords(text):
+    return Template('{{ text|truncatewords:10 }}').render(
+        Context({'text': text})
+    )
+
+
+@pytest.mark.parametrize('text', [LONG_TEXT, 'Коротко.', 'Строка\nвторая'])
+def test_excerpt_filled_on_save(post_with_published_location, text):
+    post = post_with_published_location
+    post.text = text
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(text), (
+        'Убедитесь, что при сохранении поста поле excerpt заполняется так же,'
+        ' как фильтр truncatewords:10.'
+    )
+
+
+def test_feed_does_not_load_text(post_with_published_location):
+    post = Post.objects.for_feed().get(pk=post_with_published_location.pk)
+    deferred = post.get_deferred_fields()
+    assert {'text', 'text_html'} <= deferred, (
+        'Убедитесь, что для лент полный текст поста не загружается.'
+    )
+    assert 'excerpt' not in deferred
+
+
+def test_backfill_post_text(capsys, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        text=LONG_TEXT, excerpt='', text_html=''
+    )
+    call_command('backfill_post_text', batch_size=1)
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT)
+    assert post.text_html == LONG_TEXT, (
+        'Убедитесь, что backfill_post_text заполняет excerpt и text_html.'
+    )
+    assert 'Обновлено постов: 1' in capsys.readouterr().out
+    call_command('backfill_post_text')
+    assert 'Обновлено постов: 0' in capsys.readouterr().out
@@ -0,0 +1,209 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from PIL import Image
+
+from blog import images
+from blog.images import derivative_name, generate_derivatives
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    # Фото и их копии не должны оставаться в media/ проекта.
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def image_file():
+    img = Image.new('RGB', (1000, 500), color=(73, 109, 137))
+    img_io = BytesIO()
+    img.save(img_io, format='JPEG')
+    return ImageFile(img_io, name='wide_image.jpg')
+
+
+def test_derivatives_created_after_upload(
+        settings, mixer, user, published_category, unlogged_client,
+        image_file, django_capture_on_commit_callbacks
+):
+    settings.BLOG_IMAGE_WORKERS = 0
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            is_published=True, image=image_file
+        )
+    post.refresh_from_db()
+    assert post.image_info['widths'] == [320, 640, 960], (
+        "Убедитесь, что после загрузки фото создаются копии всех ширин"
+        " меньше оригинала."
+    )
+    for width in (320, 640, 960):
+        name = derivative_name(post.image.name, width)
+        assert default_storage.exists(name)
+        with default_storage.open(name) as derivative:
+            image = Image.open(derivative)
+            assert (image.format, image.width) == ('WEBP', width)
+
+    content = unlogged_client.get(f'/posts/{post.id}/').content.decode()
+    assert f'{derivative_name(post.image.url, 320)} 320w' in content, (
+        "Убедитесь, что фото поста выводится с атрибутом srcset."
+    )
+    assert f'{post.image.url} 1000w' in content
+
+
+def test_image_info_saved_on_upload(
+        mixer, user, published_category, unlogged_client, image_file
+):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, image=image_file
+    )
+    post.refresh_from_db()
+    info = post.image_info
+    assert (info['width'], info['height']) == (1000, 500), (
+        "Убедитесь, что размеры фото сохраняются при загрузке."
+    )
+    with default_storage.open(post.image.name) as stored:
+        assert info['size'] == stored.size
+    assert len(info['sha256']) == 64
+
+    content = unlogged_client.get('/').content.decode()
+    assert 'width="1000" height="500"' in content, (
+        "Убедитесь, что у фото в ленте указаны атрибуты width и height."
+    )
+
+
+def test_backfill_image_info(mixer, user, published_category, image_file):
+    from django.core.management import call_command
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=image_file
+    )
+    post.__class__.objects.filter(pk=post.pk).update(image_info={})
+    call_command('backfill_image_info', stdout=StringIO())
+    post.refresh_from_db()
+    assert post.image_info['width'] == 1000
+
+
+def test_same_image_stored_once(mixer, user, published_category):
+    def blend():
+        img = Image.new('RGB', (10, 10), color=(1, 2, 3))
+        img_io = BytesIO()
+        img.save(img_io, format='PNG')
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            image=ImageFile(img_io, name='photo.PNG')
+        )
+
+    first, second = blend(), blend()
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые фото хранятся в одном файле."
+    )
+    assert first.image.name.endswith(f'{first.image_info["sha256"]}.png')
+
+
+def test_collect_media_removes_unreferenced_files(
+        mixer, user, published_category, image_file
+):
+    from django.core.management import call_command
+
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=image_file
+    )
+    kept = post.image.name
+    orphan = default_storage.save('post_images/orphan.jpg', BytesIO(b'x'))
+    orphan_copy = default_storage.save(
+        derivative_name(orphan, 320), BytesIO(b'x')
+    )
+
+    call_command('collect_media', grace=0, dry_run=True, stdout=StringIO())
+    assert default_storage.exists(orphan)
+
+    call_command('collect_media', grace=0, stdout=StringIO())
+    assert not default_storage.exists(orphan)
+    assert not default_storage.exists(orphan_copy)
+    assert default_storage.exists(kept), (
+        "Убедитесь, что сборщик не удаляет фото, на которые ссылаются посты."
+    )
+
+
+def test_first_derivative_writer_wins(media_root, image_file):
+    checked = set()
+
+    class RacingStorage(FileSystemStorage):
+        # Первая проверка копии прошла до того, как её записал другой поток.
+        def exists(self, name):
+            if name.endswith('.webp') and name not in checked:
+                checked.add(name)
+                return False
+            return super().exists(name)
+
+    storage = RacingStorage(location=media_root)
+    name = storage.save('post_images/wide_image.jpg', image_file)
+    target = derivative_name(name, 320)
+    storage.save(target, BytesIO(b'first'))
+    checked.clear()
+
+    generate_derivatives(name, storage=storage)
+    copies = sorted(
+        path.name for path in (media_root / 'post_images').iterdir()
+    )
+    assert copies == [
+        'wide_image.320w.webp',
+        'wide_image.640w.webp',
+        'wide_image.960w.webp',
+        'wide_image.jpg',
+    ], (
+        "Убедитесь, что при одновременной генерации копий не остаются"
+        " дубликаты с суффиксом в имени."
+    )
+    with storage.open(target) as derivative:
+        assert derivative.read() == b'first'
+
+
+def test_derivative_queue_is_bounded(monkeypatch, settings):
+    settings.BLOG_IMAGE_MAX_PENDING = 1
+    monkeypatch.setattr(images, '_executor', None)
+    submitted = []
+    monkeypatch.setattr(
+        images.ThreadPoolExecutor, 'submit',
+        lambda self, *args: submitted.append(args)
+    )
+    assert images.submit_derivatives(1, 'post_images/a.jpg')
+    assert not images.submit_derivatives(2, 'post_images/b.jpg'), (
+        "Убедитесь, что очередь генерации копий ограничена"
+        " BLOG_IMAGE_MAX_PENDING."
+    )
+    assert len(submitted) == 1
+    images._pending.release()
+    images.get_executor().shutdown()
+
+
+def test_upload_hashed_once(
+        monkeypatch, mixer, user, published_category, image_file
+):
+    import hashlib
+
+    calls = []
+    original_sha256 = hashlib.sha256
+
+    def sha256(*args):
+        calls.append(args)
+        return original_sha256(*args)
+
+    monkeypatch.setattr(hashlib, 'sha256', sha256)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=image_file
+    )
+    assert len(calls) == 1, (
+        "Убедитесь, что хранилище берёт SHA-256 фото из image_info,"
+        " а не читает файл ещё раз."
+    )
+    assert post.image.name.endswith(f'{post.image_info["sha256"]}.jpg')
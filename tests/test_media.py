@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+
+CONTENT = bytes(range(256)) * 4
+IMMUTABLE_NAME = 'post_images/ab/' + 'ab' * 32 + '.jpg'
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+    def create(name):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(CONTENT)
+        return f'/media/{name}'
+    return create
+
+
+def test_media_cache_headers(client, media_file):
+    url = media_file(IMMUTABLE_NAME)
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert b''.join(response.streaming_content) == CONTENT
+    assert 'immutable' in response['Cache-Control'], (
+        "Убедитесь, что файлы с адресацией по содержимому кэшируются"
+        " навсегда."
+    )
+    not_modified = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+    response = client.get(media_file('post_images/legacy.jpg'))
+    assert 'immutable' not in response['Cache-Control']
+
+
+@pytest.mark.parametrize(('header', 'status', 'body'), [
+    ('bytes=10-19', HTTPStatus.PARTIAL_CONTENT, CONTENT[10:20]),
+    ('bytes=-5', HTTPStatus.PARTIAL_CONTENT, CONTENT[-5:]),
+    ('bytes=1000-', HTTPStatus.PARTIAL_CONTENT, CONTENT[1000:]),
+    ('bytes=5000-', HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, b''),
+])
+def test_media_range_requests(client, media_file, header, status, body):
+    response = client.get(
+        media_file('post_images/video.mp4'), HTTP_RANGE=header
+    )
+    assert response.status_code == status, (
+        "Убедитесь, что медиафайлы отдаются по частям по заголовку Range."
+    )
+    content = (
+        b''.join(response.streaming_content)
+        if response.streaming else response.content
+    )
+    assert content == body
+
+
+def test_media_sendfile_offload(settings, client, media_file):
+    settings.MEDIA_SENDFILE_BACKEND = 'x-accel-redirect'
+    response = client.get(media_file('post_images/photo.jpg'))
+    assert response['X-Accel-Redirect'] == (
+        '/protected-media/post_images/photo.jpg'
+    )
+    assert not response.content
+
+
+def test_media_path_traversal(client, media_file):
+    media_file('post_images/photo.jpg')
+    response = client.get('/media/../settings.py')
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,136 @@
+from functools import partial
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from blog import moderation
+from blog.models import Comment, Post
+from blog.search import get_backend
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELIST_URL = '/admin/blog/post/'
+
+
+@pytest.fixture
+def blend_post(mixer, published_category):
+    def blend(author, **kwargs):
+        kwargs.setdefault('is_published', True)
+        return mixer.blend(
+            'blog.Post', author=author, category=published_category,
+            pub_date=timezone.now(), **kwargs
+        )
+    return blend
+
+
+def test_bulk_unpublish_is_set_based(
+        admin_client, user, blend_post, django_assert_max_num_queries
+):
+    posts = [blend_post(user) for _ in range(5)]
+    data = {
+        'action': 'unpublish',
+        '_selected_action': [post.id for post in posts],
+    }
+    with django_assert_max_num_queries(15):
+        response = admin_client.post(CHANGELIST_URL, data)
+    assert response.status_code == HTTPStatus.FOUND
+    assert not Post.objects.filter(is_published=True).exists(), (
+        'Убедитесь, что действие «Снять с публикации» снимает с публикации'
+        ' все выбранные посты.'
+    )
+
+
+def test_reassign_category_requires_category(
+        admin_client, user, blend_post, mixer
+):
+    post = blend_post(user)
+    category = mixer.blend('blog.Category', is_published=True)
+    data = {'action': 'move_to_category', '_selected_action': [post.id]}
+    admin_client.post(CHANGELIST_URL, data)
+    post.refresh_from_db()
+    assert post.category != category
+    admin_client.post(CHANGELIST_URL, {**data, 'category': category.id})
+    post.refresh_from_db()
+    assert post.category == category, (
+        'Убедитесь, что действие переносит выбранные посты в категорию,'
+        ' выбранную в форме действия.'
+    )
+
+
+def test_delete_authors_content(
+        admin_client, user, another_user, blend_post, mixer
+):
+    spam_post = blend_post(another_user, title='Спам')
+    own_post = blend_post(user)
+    mixer.cycle(2).blend('blog.Comment', post=spam_post, author=user)
+    mixer.blend('blog.Comment', post=own_post, author=user)
+    spam_comment = mixer.blend(
+        'blog.Comment', post=own_post, author=another_user, text='Спам'
+    )
+    Post.objects.filter(pk=own_post.pk).update(comment_count=2)
+
+    data = {
+        'action': 'delete_authors_content',
+        '_selected_action': [spam_post.id],
+    }
+    response = admin_client.post(CHANGELIST_URL, data)
+    assert response.status_code == HTTPStatus.OK
+    assert another_user.username in response.content.decode()
+    assert Post.objects.filter(author=another_user).exists(), (
+        'Убедитесь, что действие сначала показывает страницу подтверждения'
+        ' со списком авторов и ничего не удаляет.'
+    )
+
+    admin_client.post(CHANGELIST_URL, {**data, 'post': 'yes'})
+
+    assert not Post.objects.filter(author=another_user).exists()
+    assert not Comment.objects.filter(author=another_user).exists()
+    assert list(Comment.objects.values_list('post', flat=True)) == [
+        own_post.id
+    ], (
+        'Убедитесь, что вместе с постами автора удаляются комментарии'
+        ' под ними и все его комментарии под чужими постами.'
+    )
+    own_post.refresh_from_db()
+    assert own_post.comment_count == 1, (
+        'Убедитесь, что счётчик комментариев оставшихся постов уменьшается.'
+    )
+    backend = get_backend()
+    assert not backend.filter_posts(Post.objects.all(), 'Спам').exists()
+    assert not backend.filter_comments(
+        Comment.objects.all(), 'Спам'
+    ).filter(pk=spam_comment.pk).exists()
+
+
+def test_failed_batch_is_rolled_back(
+        monkeypatch, user, another_user, blend_post, mixer
+):
+    posts = [blend_post(another_user) for _ in range(2)]
+    for post in posts:
+        mixer.blend('blog.Comment', post=post, author=user)
+    calls = []
+    backend = get_backend()
+    delete_posts = backend.delete_posts
+
+    def failing_delete_posts(pks):
+        calls.append(pks)
+        if len(calls) == 2:
+            raise RuntimeError('Сбой индекса')
+        delete_posts(pks)
+
+    monkeypatch.setattr(
+        moderation, 'iter_pk_batches',
+        partial(moderation.iter_pk_batches, batch_size=1)
+    )
+    monkeypatch.setattr(backend, 'delete_posts', failing_delete_posts)
+    with pytest.raises(RuntimeError):
+        moderation.delete_authors_content([another_user.id])
+
+    assert list(Post.objects.values_list('pk', flat=True)) == [posts[1].pk]
+    assert list(Comment.objects.values_list('post', flat=True)) == [
+        posts[1].pk
+    ], (
+        'Убедитесь, что при ошибке в пачке её посты и комментарии под ними'
+        ' остаются на месте.'
+    )
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.paginator import Paginator
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+
+
+def test_elided_page_range_is_bounded(rf):
+    page_obj = Paginator(range(10000), 10).page(500)
+    html = render_to_string(
+        'includes/paginator.html',
+        {'page_obj': page_obj},
+        request=rf.get('/', {'page': 500})
+    )
+    assert html.count('<li') <= 15, (
+        'Убедитесь, что при тысяче страниц пагинатор выводит ограниченное'
+        ' число ссылок, а не ссылку на каждую страницу.'
+    )
+    for number in ('1', '498', '500', '502', '1000'):
+        assert f'>{number}<' in html.replace(' ', '').replace('\n', '')
+    assert '…' in html
+
+
+def count_queries(client):
+    with CaptureQueriesContext(connection) as context:
+        assert client.get('/').status_code == HTTPStatus.OK
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'COUNT(' in query['sql'].upper()
+    ]
+
+
+@pytest.mark.django_db
+def test_feed_count_is_cached_until_post_changes(
+        user_client, many_posts_with_published_locations
+):
+    assert count_queries(user_client), (
+        'Ожидался COUNT при первом открытии главной страницы.'
+    )
+    assert not count_queries(user_client), (
+        'Убедитесь, что число постов на главной берётся из кэша и COUNT'
+        ' не выполняется при каждом запросе.'
+    )
+    post = many_posts_with_published_locations[0]
+    post.title = 'Новый заголовок'
+    post.save()
+    assert count_queries(user_client), (
+        'Убедитесь, что закэшированное число постов сбрасывается при'
+        ' сохранении поста.'
+    )
+
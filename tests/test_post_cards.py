@@ -0,0 +1,50 @@
+import pytest
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def profile_html(user_client, user):
+    def get():
+        return user_client.get(f'/profile/{user.username}/').content.decode()
+    return get
+
+
+def test_post_card_served_from_fragment_cache(
+        profile_html, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in profile_html()
+    # update() не вызывает сигналов и не меняет updated_at.
+    Post.objects.filter(pk=post.pk).update(title='Заголовок мимо кэша')
+    assert post.title in profile_html(), (
+        'Убедитесь, что карточки постов в лентах берутся из кэша фрагментов.'
+    )
+    post.refresh_from_db()
+    post.save()
+    assert 'Заголовок мимо кэша' in profile_html(), (
+        'Убедитесь, что сохранение поста обновляет его карточку.'
+    )
+
+
+def test_post_card_follows_related_changes(
+        user_client, profile_html, post_with_published_location
+):
+    post = post_with_published_location
+    profile_html()
+    post.category.title = 'Новая категория'
+    post.category.save()
+    assert 'Новая категория' in profile_html(), (
+        'Убедитесь, что изменение категории обновляет карточки её постов.'
+    )
+    post.location.name = 'Новое место'
+    post.location.save()
+    assert 'Новое место' in profile_html(), (
+        'Убедитесь, что изменение местоположения обновляет карточки постов.'
+    )
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+    assert 'Комментарии (1)' in profile_html(), (
+        'Убедитесь, что новый комментарий обновляет счётчик в карточке.'
+    )
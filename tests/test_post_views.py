@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError
+from django.db.models import F
+
+from blog import views_counter
+from blog.models import Post
+from blog.views_counter import flush_views, pending_views
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_views_are_buffered_and_flushed(
+        client, mixer, post_with_published_location,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    other = mixer.blend(
+        'blog.Post', is_published=True, pub_date=post.pub_date,
+        category=post.category, author=post.author
+    )
+    url = f'/posts/{post.id}/'
+    for _ in range(3):
+        assert client.get(url).status_code == HTTPStatus.OK
+    client.get(f'/posts/{other.id}/')
+    assert Post.objects.get(pk=post.pk).views == 0, (
+        'Убедитесь, что просмотры не записываются в базу при каждом'
+        ' открытии страницы поста.'
+    )
+    assert pending_views() == {post.id: 3, other.id: 1}
+
+    # Один UPDATE на каждое число просмотров.
+    with django_assert_num_queries(2 + 2):
+        assert flush_views() == 4
+    views = dict(Post.objects.values_list('id', F('views')))
+    assert views[post.id] == 3 and views[other.id] == 1, (
+        'Убедитесь, что накопленные просмотры прибавляются к полю views.'
+    )
+    assert pending_views() == {}
+
+
+def test_views_flushed_when_buffer_is_full(
+        client, settings, post_with_published_location
+):
+    settings.BLOG_VIEWS_MAX_PENDING = 1
+    post = post_with_published_location
+    client.get(f'/posts/{post.id}/')
+    post.refresh_from_db()
+    assert post.views == 1, (
+        'Убедитесь, что буфер просмотров записывается сразу, когда в нём'
+        ' набирается BLOG_VIEWS_MAX_PENDING постов.'
+    )
+
+
+def test_full_save_keeps_counters(post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    # Пока объект был загружен, счётчики изменились в базе.
+    Post.change_comment_count(post.pk, 2)
+    Post.objects.filter(pk=post.pk).update(views=F('views') + 5)
+    post.title = 'Новый заголовок'
+    post.save()
+    post.refresh_from_db()
+    assert post.title == 'Новый заголовок'
+    assert (post.comment_count, post.views) == (2, 5), (
+        'Убедитесь, что сохранение поста не перезаписывает comment_count'
+        ' и views значениями, загруженными раньше.'
+    )
+
+
+def test_failed_flush_does_not_break_page(
+        client, settings, monkeypatch, post_with_published_location
+):
+    def locked(*args):
+        raise OperationalError('database is locked')
+
+    settings.BLOG_VIEWS_MAX_PENDING = 1
+    monkeypatch.setattr(views_counter, 'F', locked)
+    post = post_with_published_location
+    response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что ошибка записи просмотров не ломает страницу поста.'
+    )
+    assert pending_views() == {post.id: 1}, (
+        'Убедитесь, что незаписанные просмотры остаются в буфере.'
+    )
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get_with_budget(client, url, budget, assert_num_queries):
+    with assert_num_queries(budget):
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response
+
+
+def test_category_page_query_budget(
+        unlogged_client, published_category, django_assert_num_queries
+):
+    # Категория + COUNT(*) для пагинатора + ближайшая отложенная публикация
+    # для срока жизни кэша; пустая страница запроса не требует.
+    _get_with_budget(
+        unlogged_client,
+        f'/category/{published_category.slug}/',
+        3,
+        django_assert_num_queries,
+    )
+
+
+def test_profile_page_query_budget(
+        unlogged_client, user_client, user, django_assert_num_queries
+):
+    url = f'/profile/{user.username}/'
+    # Пользователь + COUNT(*) для пагинатора + ближайшая отложенная
+    # публикация для срока жизни кэша.
+    _get_with_budget(unlogged_client, url, 3, django_assert_num_queries)
+    # Автору страница не кэшируется, но добавляются сессия и пользователь.
+    _get_with_budget(user_client, url, 4, django_assert_num_queries)
+
+
+@pytest.mark.parametrize(('url_template', 'budget'), [
+    # COUNT(*) + ближайшая отложенная публикация + лента.
+    ('/', 3),
+    # Категория + COUNT(*) + лента + ближайшая отложенная публикация.
+    ('/category/{category.slug}/', 4),
+    # Пользователь + COUNT(*) + лента + ближайшая отложенная публикация.
+    ('/profile/{user.username}/', 4),
+])
+def test_feed_query_budget_does_not_grow_with_posts(
+        unlogged_client, user, published_category, url_template, budget,
+        many_posts_with_published_locations, django_assert_num_queries
+):
+    url = url_template.format(category=published_category, user=user)
+    response = _get_with_budget(
+        unlogged_client, url, budget, django_assert_num_queries
+    )
+    assert len(response.context['page_obj']) > 1
+
+
+def test_anonymous_feed_served_from_cache(
+        unlogged_client, mixer, user, published_category,
+        many_posts_with_published_locations, django_assert_num_queries
+):
+    unlogged_client.get('/')
+    with django_assert_num_queries(0):
+        cached = unlogged_client.get('/')
+    assert cached.status_code == HTTPStatus.OK
+
+    new_post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, title='Свежая публикация',
+        pub_date=timezone.now()
+    )
+    content = unlogged_client.get('/').content.decode('utf-8')
+    assert new_post.title in content, (
+        "Убедитесь, что новая публикация сразу видна в закэшированной ленте."
+    )
+
+
+def test_feed_cache_expires_at_next_publication(
+        mixer, user, published_category
+):
+    from blog.cache import get_feed_cache_timeout
+
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(seconds=30)
+    )
+    assert 1 <= get_feed_cache_timeout(3600) <= 30, (
+        "Убедитесь, что кэш лент истекает к моменту ближайшей отложенной"
+        " публикации."
+    )
+
+
+def test_post_detail_query_budget(
+        unlogged_client, post_with_published_location, comment_to_a_post,
+        django_assert_num_queries
+):
+    # Пост со связанными объектами одним запросом + комментарии +
+    # ближайшая отложенная публикация для ETag.
+    response = _get_with_budget(
+        unlogged_client,
+        f'/posts/{post_with_published_location.id}/',
+        3,
+        django_assert_num_queries,
+    )
+    content = response.content.decode('utf-8')
+    assert f'name="comment_{comment_to_a_post.id}"' in content
+
+
+@pytest.mark.parametrize('url_template', [
+    '/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+    '/posts/{post.id}/',
+])
+def test_not_modified_without_queries(
+        unlogged_client, post_with_published_location, url_template,
+        django_assert_num_queries
+):
+    url = url_template.format(post=post_with_published_location)
+    response = unlogged_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.has_header('ETag') and response.has_header(
+        'Last-Modified'
+    ), "Убедитесь, что страницы блога отдают ETag и Last-Modified."
+
+    with django_assert_num_queries(0):
+        not_modified = unlogged_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что на запрос с актуальным ETag возвращается"
+        " 304 Not Modified."
+    )
+
+    post_with_published_location.title = 'Новый заголовок'
+    post_with_published_location.save()
+    changed = unlogged_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert changed.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после изменения поста ETag страниц меняется."
+    )
+
+
+def test_no_validators_without_shared_cache(
+        unlogged_client, post_with_published_location, settings
+):
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    url = f'/posts/{post_with_published_location.id}/'
+    response = unlogged_client.get(url)
+    assert not response.has_header('ETag'), (
+        "Убедитесь, что ETag не выдаётся, если поколение лент хранится"
+        " в памяти процесса, а не в общем кэше."
+    )
+    assert unlogged_client.get(
+        url, HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 2099 00:00:00 GMT'
+    ).status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize('url', ['/admin/blog/post/', '/admin/blog/comment/'])
+def test_admin_changelist_queries_do_not_grow(
+        admin_client, mixer, user, published_category, url,
+        django_assert_max_num_queries
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def blend(n):
+        posts = mixer.cycle(n).blend(
+            'blog.Post', author=user, category=published_category
+        )
+        mixer.cycle(n).blend('blog.Comment', post=posts[0], author=user)
+
+    blend(2)
+    with CaptureQueriesContext(connection) as few:
+        assert admin_client.get(url).status_code == HTTPStatus.OK
+    blend(20)
+    with CaptureQueriesContext(connection) as many:
+        assert admin_client.get(url).status_code == HTTPStatus.OK
+    assert len(many) == len(few), (
+        "Убедитесь, что число запросов списка в админке не зависит от"
+        " числа объектов."
+    )
@@ -0,0 +1,109 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.utils import timezone
+
+from blog.cache import FEED_GENERATION_KEY
+from blog.models import Post
+from core.middleware import PIN_COOKIE_NAME, ReplicaPinMiddleware
+from core.routers import (
+    PrimaryReplicaRouter,
+    pin_to_primary,
+    read_from_replicas
+)
+
+router = PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.REPLICA_PIN_SECONDS = 10
+    return 'replica'
+
+
+def test_replica_reads_are_opt_in(replica):
+    assert router.db_for_read(Post) == 'default', (
+        'Убедитесь, что по умолчанию чтение идёт с основной базы.'
+    )
+    with read_from_replicas():
+        assert router.db_for_read(Post) == replica
+        assert router.db_for_write(Post) == 'default'
+        with pin_to_primary():
+            assert router.db_for_read(Post) == 'default'
+    assert router.db_for_read(Post) == 'default'
+
+
+@pytest.mark.parametrize('method, pinned', [('get', False), ('post', True)])
+def test_pin_cookie_after_writes(rf, replica, method, pinned):
+    request = getattr(rf, method)('/')
+    response = ReplicaPinMiddleware(lambda request: HttpResponse())(request)
+    assert (PIN_COOKIE_NAME in response.cookies) == pinned, (
+        'Убедитесь, что изменяющий запрос ставит cookie закрепления.'
+    )
+
+
+@pytest.fixture
+def primary_only_post(mixer, user, published_category):
+    # В базу-«реплику» ничего не реплицируется.
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(), title='Только в основной'
+    )
+
+
+def age_feed_generation(seconds):
+    cache.set(FEED_GENERATION_KEY, time.time() - seconds, None)
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_feed_reads_from_replica(client, replica, primary_only_post):
+    title = primary_only_post.title
+    age_feed_generation(60)
+    response = client.get('/')
+    assert title not in response.content.decode(), (
+        'Убедитесь, что ленты читаются с реплики.'
+    )
+    assert response.has_header('ETag')
+
+    # Закэшированная страница — из реплики, которая здесь не догоняет.
+    cache.clear()
+    age_feed_generation(60)
+    client.cookies[PIN_COOKIE_NAME] = '1'
+    assert title in client.get('/').content.decode(), (
+        'Убедитесь, что после изменяющего запроса пользователь читает'
+        ' с основной базы.'
+    )
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_fresh_replica_pages_not_cached(client, replica, primary_only_post):
+    age_feed_generation(1)
+    response = client.get('/')
+    assert primary_only_post.title not in response.content.decode(), (
+        'Убедитесь, что сразу после изменения лент остальные пользователи'
+        ' по-прежнему читают с реплики.'
+    )
+    assert not response.has_header('ETag'), (
+        'Убедитесь, что странице с возможно отстающей реплики не выдаётся'
+        ' ETag нового поколения.'
+    )
+    client.cookies[PIN_COOKIE_NAME] = '1'
+    assert primary_only_post.title in client.get('/').content.decode(), (
+        'Убедитесь, что страница, прочитанная с отстающей реплики, не'
+        ' попадает в кэш лент.'
+    )
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_commands_read_from_primary(replica, mixer, primary_only_post):
+    mixer.blend('blog.Comment', post=primary_only_post)
+    age_feed_generation(60)
+    call_command('recount_comments')
+    primary_only_post.refresh_from_db()
+    assert primary_only_post.comment_count == 1, (
+        'Убедитесь, что команды читают с основной базы, а не с реплик.'
+    )
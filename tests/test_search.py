@@ -0,0 +1,140 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import (
+    PostgresSearchBackend,
+    SQLiteSearchBackend,
+    get_backend,
+    search_posts
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    def blend(**kwargs):
+        kwargs.setdefault('is_published', True)
+        return mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            pub_date=timezone.now(), **kwargs
+        )
+    return {
+        'in_title': blend(title='Путешествие на Байкал', text='Озеро.'),
+        'in_text': blend(title='Заметки', text='Летом ездили на байкал.'),
+        'hidden': blend(
+            title='Байкал зимой', text='Черновик.', is_published=False
+        ),
+        'other': blend(title='Рецепт пирога', text='Мука и яблоки.'),
+    }
+
+
+def test_search_ranks_published_posts(unlogged_client, searchable_posts):
+    response = unlogged_client.get('/search/', {'q': 'байкал'})
+    assert response.status_code == HTTPStatus.OK
+    found = [post.id for post in response.context['page_obj']]
+    assert found == [
+        searchable_posts['in_title'].id, searchable_posts['in_text'].id
+    ], (
+        "Убедитесь, что поиск находит только опубликованные посты и ставит"
+        " совпадения в заголовке выше совпадений в тексте."
+    )
+
+
+def test_search_index_follows_changes(
+        unlogged_client, searchable_posts, comment_to_a_post, CommentModel
+):
+    post = searchable_posts['other']
+    post.text = 'Пирог с черникой.'
+    post.save()
+    response = unlogged_client.get('/search/', {'q': 'черник'})
+    assert [p.id for p in response.context['page_obj']] == [post.id], (
+        "Убедитесь, что поисковый индекс обновляется при изменении поста."
+    )
+
+    post.delete()
+    response = unlogged_client.get('/search/', {'q': 'черник'})
+    assert not response.context['page_obj']
+
+    comment_to_a_post.text = 'Уникальноеслово в комментарии'
+    comment_to_a_post.save()
+    found = get_backend().filter_comments(
+        CommentModel.objects.all(), 'уникальноеслово'
+    )
+    assert list(found) == [comment_to_a_post]
+
+
+def test_search_query_syntax_is_escaped(unlogged_client, searchable_posts):
+    for query in ('"', 'AND OR', '*', 'байкал)', ''):
+        response = unlogged_client.get('/search/', {'q': query})
+        assert response.status_code == HTTPStatus.OK
+
+
+def test_search_matches_index_once(searchable_posts, django_assert_num_queries):
+    if not isinstance(get_backend(), SQLiteSearchBackend):
+        pytest.skip('Проверка плана запроса к FTS5')
+    results = search_posts(Post.objects.all(), 'байкал')
+    assert str(results.query).count('MATCH') == 1, (
+        'Убедитесь, что индекс поиска присоединяется к запросу один раз,'
+        ' а не опрашивается для каждой найденной строки.'
+    )
+    with django_assert_num_queries(1):
+        assert results.count() == 3
+    assert results[0].search_rank >= results[1].search_rank
+
+
+def test_search_finds_posts_by_comments(
+        unlogged_client, mixer, user, searchable_posts
+):
+    post = searchable_posts['other']
+    comment = mixer.blend(
+        'blog.Comment', post=post, author=user, text='Был на Байкале летом'
+    )
+    response = unlogged_client.get('/search/', {'q': 'байкал'})
+    found = [p.id for p in response.context['page_obj']]
+    assert found == [
+        searchable_posts['in_title'].id,
+        searchable_posts['in_text'].id,
+        post.id,
+    ], (
+        "Убедитесь, что поиск находит посты и по тексту комментариев,"
+        " ставя их ниже совпадений в самом посте."
+    )
+
+    comment.delete()
+    response = unlogged_client.get('/search/', {'q': 'байкал'})
+    assert post.id not in [p.id for p in response.context['page_obj']], (
+        "Убедитесь, что после удаления комментария пост больше не находится"
+        " по его тексту."
+    )
+
+
+def test_admin_post_search_ignores_comments(
+        mixer, user, searchable_posts
+):
+    post = searchable_posts['other']
+    mixer.blend('blog.Comment', post=post, author=user, text='Байкал')
+    found = get_backend().filter_posts(Post.objects.all(), 'байкал')
+    assert post not in found
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='Нужен PostgreSQL'
+)
+def test_postgres_search(mixer, user, searchable_posts):
+    assert isinstance(get_backend(), PostgresSearchBackend)
+    post = searchable_posts['other']
+    mixer.blend('blog.Comment', post=post, author=user, text='Байкал')
+    found = list(search_posts(Post.published_posts.all(), 'байкал'))
+    assert found == [
+        searchable_posts['in_title'],
+        searchable_posts['in_text'],
+        post,
+    ], (
+        "Убедитесь, что поиск на PostgreSQL ранжирует совпадения по"
+        " search_vector и находит посты по комментариям."
+    )
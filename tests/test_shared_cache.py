@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.core.cache import caches
+
+from blog.cache import get_feed_generation
+from core.checks import check_shared_cache
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+BUMP_IN_OTHER_PROCESS = (
+    'import django; django.setup(); '
+    'from blog.cache import bump_feed_generation; bump_feed_generation()'
+)
+
+
+def test_feed_invalidation_is_seen_by_other_processes():
+    before = get_feed_generation()
+    # Отдельный процесс — как другой процесс сервера, обработавший запись.
+    subprocess.run(
+        [sys.executable, '-c', BUMP_IN_OTHER_PROCESS],
+        cwd=PROJECT_DIR,
+        env={
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'blogicum.settings',
+            'MEMCACHED_LOCATION': '',
+        },
+        check=True
+    )
+    assert get_feed_generation() != before, (
+        'Убедитесь, что кэш общий для процессов: сброс кэша лент в одном'
+        ' процессе должен быть виден в остальных.'
+    )
+    other_client = caches.create_connection('default')
+    assert other_client.get('blog:feed_generation') == get_feed_generation()
+
+
+def test_local_memory_cache_rejected_with_many_workers(settings):
+    settings.SERVER_WORKERS = 4
+    assert check_shared_cache(None) == []
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    assert [error.id for error in check_shared_cache(None)] == ['core.E001']
+    settings.SERVER_WORKERS = 1
+    assert check_shared_cache(None) == []
@@ -0,0 +1,30 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+pytestmark = [pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Настройки только для SQLite'
+)]
+
+
+@pytest.mark.django_db
+def test_connection_pragmas(settings):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA busy_timeout')
+        busy_timeout = cursor.fetchone()[0]
+    assert synchronous == 1 and busy_timeout == (
+        settings.SQLITE_PRAGMAS['busy_timeout']
+    ), (
+        'Убедитесь, что при открытии соединения с SQLite выполняются'
+        ' PRAGMA из SQLITE_PRAGMAS.'
+    )
+
+
+def test_sqlite_benchmark(capsys):
+    call_command(
+        'sqlite_benchmark', duration=0.2, rows=100, readers=2, writers=1
+    )
+    output = capsys.readouterr().out
+    assert 'SQLITE_PRAGMAS' in output and 'Записей в секунду' in output
@@ -0,0 +1,66 @@
+import gzip
+from http import HTTPStatus
+
+import pytest
+
+CSS = b'body { color: red; }' * 100
+
+
+@pytest.fixture
+def static_root(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    (tmp_path / 'site.css').write_bytes(CSS)
+    (tmp_path / 'site.css.gz').write_bytes(gzip.compress(CSS))
+    return tmp_path
+
+
+@pytest.mark.parametrize(('accept_encoding', 'encoding'), [
+    ('gzip, deflate', 'gzip'),
+    ('identity', None),
+])
+def test_precompressed_static_by_accept_encoding(
+        client, static_root, accept_encoding, encoding
+):
+    response = client.get(
+        '/static/site.css', HTTP_ACCEPT_ENCODING=accept_encoding
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.get('Content-Encoding') == encoding, (
+        "Убедитесь, что статика отдаётся сжатой, если клиент это допускает."
+    )
+    assert response['Content-Type'] == 'text/css'
+    assert 'Accept-Encoding' in response['Vary']
+    body = b''.join(response.streaming_content)
+    assert (gzip.decompress(body) if encoding else body) == CSS
+
+
+@pytest.mark.django_db
+def test_pages_render_before_collectstatic(
+        settings, tmp_path, client, enable_debug_false
+):
+    settings.STATIC_ROOT = tmp_path
+    response = client.get('/')
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что без собранной статики страницы выводятся со"
+        " ссылками на исходные имена файлов."
+    )
+    assert '/static/css/bootstrap.min.css' in response.content.decode()
+
+
+def test_hashed_static_names_built_once_per_manifest(monkeypatch):
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    from core.views import get_hashed_static_names
+
+    manifest = {'site.css': 'site.0123456789ab.css'}
+    monkeypatch.setattr(staticfiles_storage, 'hashed_files', manifest)
+    names = get_hashed_static_names()
+    assert names == {'site.0123456789ab.css'}
+    assert get_hashed_static_names() is names, (
+        'Убедитесь, что множество имён из манифеста не строится заново'
+        ' на каждый запрос.'
+    )
+    monkeypatch.setattr(
+        staticfiles_storage, 'hashed_files', {'site.css': 'site.ba98.css'}
+    )
+    assert get_hashed_static_names() == {'site.ba98.css'}
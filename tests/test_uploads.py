@@ -0,0 +1,66 @@
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _png(size):
+    img_io = BytesIO()
+    Image.new('1', size).save(img_io, format='PNG')
+    return SimpleUploadedFile(
+        'upload.png', img_io.getvalue(), content_type='image/png'
+    )
+
+
+@pytest.mark.parametrize(('limits', 'size'), [
+    ({'BLOG_UPLOAD_MAX_BYTES': 100}, (1000, 1000)),
+    ({'BLOG_UPLOAD_MAX_PIXELS': 10_000}, (200, 200)),
+])
+def test_oversized_upload_rejected(
+        settings, user_client, published_category, PostModel, limits, size
+):
+    for name, value in limits.items():
+        setattr(settings, name, value)
+    response = user_client.post('/posts/create/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2023-01-01',
+        'category': published_category.id,
+        'image': _png(size),
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['form'].errors.get('image'), (
+        "Убедитесь, что слишком большое фото отклоняется с ошибкой в форме."
+    )
+    assert not PostModel.objects.exists()
+
+
+@pytest.mark.parametrize('handlers', [
+    ['blog.uploadhandlers.LimitedTemporaryFileUploadHandler'],
+    ['django.core.files.uploadhandler.MemoryFileUploadHandler'],
+])
+def test_oversized_upload_rejected_in_admin(
+        settings, admin_client, user, published_category, PostModel, handlers
+):
+    settings.FILE_UPLOAD_HANDLERS = handlers
+    settings.BLOG_UPLOAD_MAX_PIXELS = 10_000
+    response = admin_client.post('/admin/blog/post/add/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date_0': '2023-01-01',
+        'pub_date_1': '12:00:00',
+        'author': user.id,
+        'category': published_category.id,
+        'is_published': 'on',
+        'image': _png((200, 200)),
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['adminform'].form.errors.get('image'), (
+        "Убедитесь, что слишком большое фото отклоняется и в админке,"
+        " а не сохраняется пост без фото."
+    )
+    assert not PostModel.objects.exists()